@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Benchmark bez sajta: snimljene stranice se puštaju kroz ReplayFetcher
+
+Meri extract_data_from_profile, get_profile_link (parsiranje pretrage),
+save_to_csv, baferovan upis kroz sink i format_all_data na 1k, 10k i 100k redova i poredi izvučena
+polja sa zlatnim vrednostima iz golden.json. Rezultat se čuva sa --save i
+poredi sa ranijim preko --compare (izlazni kod 1 ako ima regresija).
+
+Korpus u bench_fixtures/ je sintetički (izmišljene firme, struktura kao na
+sajtu). Pravi korpus se pravi komandom record iz keša stranica, uz
+anonimizaciju email adresa i telefona. Komanda check pušta ceo scraper kroz
+korpus, sa i bez --pipeline, za CSV i SQLite izlaz.
+"""
+
+import argparse
+import contextlib
+import csv
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from extractor import EMAIL_RE, parse_profile_html
+from fetchers import DEFAULT_REPLAY_DIR, REPLAY_MANIFEST, ReplayFetcher
+from page_cache import DEFAULT_CACHE_DIR, PageCache
+from pib_index import DEFAULT_INDEX_DB, PibIndex
+from phone_numbers import PHONE_SCAN_RE
+from pib_utils import load_pibs, pib_check_digit
+from result_sink import RESULT_COLUMNS, open_sink
+
+GOLDEN_FILE = "golden.json"
+DEFAULT_SCALES = (1000, 10000, 100000)
+DEFAULT_TOLERANCE = 0.25
+STAGES = ('extract', 'profile_link', 'save_to_csv', 'sink_write', 'format_all_data')
+FIELDS = [col for col in RESULT_COLUMNS if col != 'pib']
+
+
+def load_golden(corpus_dir):
+    with open(os.path.join(corpus_dir, GOLDEN_FILE), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+@contextlib.contextmanager
+def quiet():
+    """Ispis funkcija koje se mere ide u /dev/null (ne meri se terminal)"""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def synthetic_pibs(n, start=4000000):
+    """n ispravnih PIB-ova (sa kontrolnom cifrom) za sintetičke redove"""
+    pibs = []
+    for i in range(n):
+        base = f"{start + i:07d}"
+        pibs.append(base + str(pib_check_digit(base)))
+    return pibs
+
+
+def golden_rows(golden):
+    return [c['expected'] for c in golden['companies'] if c['expected']]
+
+
+def excel_damaged(pib, row, i):
+    """Red kakav stiže posle Excel-a: PIB bez vodeće nule i sa '.0', KD sa '.0'"""
+    row = dict(row, pib=pib)
+    if i % 2:
+        row['pib'] = pib.lstrip('0') + '.0'
+        if row.get('kd'):
+            row['kd'] += '.0'
+        if row.get('telefon', '').startswith('06'):
+            row['telefon'] = row['telefon'][1:]
+    return row
+
+
+# ===== MERENJA =====
+
+def bench_extract(scraper, fetcher, golden, n):
+    urls = [c['profile_url'] for c in golden['companies'] if c['profile_url']]
+    start = time.perf_counter()
+    with quiet():
+        for i in range(n):
+            scraper.extract_data_from_profile(fetcher, urls[i % len(urls)])
+    return time.perf_counter() - start
+
+
+def bench_profile_link(scraper, fetcher, golden, n):
+    pibs = [c['pib'] for c in golden['companies']]
+    base_url = golden['base_url']
+    start = time.perf_counter()
+    for i in range(n):
+        scraper.get_profile_link(fetcher, pibs[i % len(pibs)], base_url=base_url)
+    return time.perf_counter() - start
+
+
+def bench_save_to_csv(scraper, golden, n, workdir):
+    path = os.path.join(workdir, f"save_{n}.csv")
+    rows = golden_rows(golden)
+    pibs = synthetic_pibs(n)
+    start = time.perf_counter()
+    for i, pib in enumerate(pibs):
+        scraper.save_to_csv(pib, rows[i % len(rows)], path)
+    return time.perf_counter() - start
+
+
+def bench_sink_write(golden, n, workdir):
+    """Baferovan upis kroz open_sink, kao u main()"""
+    path = os.path.join(workdir, f"sink_{n}.csv")
+    rows = golden_rows(golden)
+    pibs = synthetic_pibs(n)
+    start = time.perf_counter()
+    with open_sink(path) as sink:
+        for i, pib in enumerate(pibs):
+            sink.write(pib, rows[i % len(rows)])
+    return time.perf_counter() - start
+
+
+def bench_format_all_data(golden, n, workdir):
+    from format_final import format_all_data
+
+    path = os.path.join(workdir, f"format_{n}.csv")
+    rows = golden_rows(golden)
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_COLUMNS)
+        writer.writeheader()
+        for i, pib in enumerate(synthetic_pibs(n)):
+            writer.writerow(excel_damaged(pib, rows[i % len(rows)], i))
+    start = time.perf_counter()
+    with quiet():
+        format_all_data(path)
+    return time.perf_counter() - start
+
+
+def run_benchmarks(corpus_dir, scales):
+    """Vraća {'timings': {faza: {broj redova: sekunde}}, 'accuracy': {...}}"""
+    import scraper_vpn as scraper
+
+    golden = load_golden(corpus_dir)
+    fetcher = ReplayFetcher.from_dir(corpus_dir)
+    timings = {stage: {} for stage in STAGES}
+    workdir = tempfile.mkdtemp(prefix="bench_")
+    try:
+        for n in scales:
+            print(f"  {n} redova...")
+            timings['extract'][str(n)] = bench_extract(scraper, fetcher, golden, n)
+            timings['profile_link'][str(n)] = bench_profile_link(scraper, fetcher, golden, n)
+            timings['save_to_csv'][str(n)] = bench_save_to_csv(scraper, golden, n, workdir)
+            timings['sink_write'][str(n)] = bench_sink_write(golden, n, workdir)
+            timings['format_all_data'][str(n)] = bench_format_all_data(golden, n, workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    accuracy, mismatches = score_accuracy(scraper, fetcher, golden)
+    return {'timings': timings, 'accuracy': accuracy, 'mismatches': mismatches}
+
+
+# ===== TAČNOST =====
+
+def _comparable(field, value):
+    """Telefon se poredi po lokalnim ciframa (+382 67... == 067...), ostalo doslovno"""
+    value = str(value or '').strip()
+    if field == 'telefon':
+        digits = ''.join(ch for ch in value if ch.isdigit())
+        return '0' + digits[3:] if digits.startswith('382') else digits
+    return value
+
+
+def score_accuracy(scraper, fetcher, golden):
+    """Procenat pogođenih polja po koloni i lista promašaja (pib, polje, očekivano, dobijeno)"""
+    hits = {field: 0 for field in ['profile_link'] + FIELDS}
+    totals = dict.fromkeys(hits, 0)
+    mismatches = []
+    with quiet():
+        for company in golden['companies']:
+            link = scraper.get_profile_link(fetcher, company['pib'], base_url=golden['base_url'])
+            totals['profile_link'] += 1
+            if link == company['profile_url']:
+                hits['profile_link'] += 1
+            else:
+                mismatches.append((company['pib'], 'profile_link', company['profile_url'], link))
+            if not company['expected']:
+                continue
+            data = scraper.extract_data_from_profile(fetcher, company['profile_url']) or {}
+            for field, expected in company['expected'].items():
+                totals[field] += 1
+                got = data.get(field, '')
+                if _comparable(field, got) == _comparable(field, expected):
+                    hits[field] += 1
+                else:
+                    mismatches.append((company['pib'], field, expected, got))
+    accuracy = {field: 100.0 * hits[field] / totals[field] for field in hits if totals[field]}
+    return accuracy, mismatches
+
+
+# ===== IZVEŠTAJ =====
+
+def print_report(results):
+    print(f"\n{'Faza':<18}{'Redova':>9}{'Ukupno (s)':>12}{'µs/red':>11}{'redova/s':>11}")
+    for stage, by_scale in results['timings'].items():
+        for n, seconds in by_scale.items():
+            rows = int(n)
+            print(f"{stage:<18}{rows:>9}{seconds:>12.3f}{seconds / rows * 1e6:>11.1f}{rows / seconds:>11.0f}")
+    print(f"\n{'Polje':<18}{'Tačnost':>9}")
+    for field, pct in results['accuracy'].items():
+        print(f"{field:<18}{pct:>8.0f}%")
+    for pib, field, expected, got in results['mismatches']:
+        print(f"  ✗ {pib} {field}: očekivano '{expected}', dobijeno '{got}'")
+
+
+def compare_results(baseline, current, tolerance=DEFAULT_TOLERANCE):
+    """Ispiši razlike prema ranijem rezultatu; vraća broj regresija"""
+    regressions = 0
+    print(f"\nPoređenje sa ranijim rezultatom (tolerancija {tolerance:.0%}):")
+    for stage, by_scale in current['timings'].items():
+        for n, seconds in by_scale.items():
+            before = baseline.get('timings', {}).get(stage, {}).get(n)
+            if not before:
+                continue
+            change = seconds / before - 1
+            mark = '✓'
+            if change > tolerance:
+                mark = '✗'
+                regressions += 1
+            print(f"  {mark} {stage} @ {n}: {before:.3f}s → {seconds:.3f}s ({change:+.0%})")
+    for field, pct in current['accuracy'].items():
+        before = baseline.get('accuracy', {}).get(field)
+        if before is not None and pct < before:
+            regressions += 1
+            print(f"  ✗ tačnost {field}: {before:.0f}% → {pct:.0f}%")
+    print(f"{'✓ Bez regresija' if not regressions else f'✗ Regresija: {regressions}'}")
+    return regressions
+
+
+# ===== PROVERA SCRAPER-A =====
+
+def check_scraper(corpus_dir):
+    """Ceo scraper kroz ReplayFetcher: bez i sa --pipeline, za CSV i SQLite izlaz.
+
+    Svaki zlatni profil mora biti upisan u izlaz i imati hash u PIB indeksu.
+    Vraća broj kombinacija sa greškom.
+    """
+    golden = load_golden(corpus_dir)
+    expected = {c['pib'] for c in golden['companies'] if c['expected']}
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scraper_vpn.py')
+    workdir = tempfile.mkdtemp(prefix="check_")
+    errors = 0
+    try:
+        input_file = os.path.join(workdir, 'pibs.txt')
+        with open(input_file, 'w', encoding='utf-8') as f:
+            f.write(''.join(f"{c['pib']}\n" for c in golden['companies']))
+        for ext in ('csv', 'sqlite'):
+            for mode in ('inline', 'pipeline'):
+                name = f"{mode}.{ext}"
+                output = os.path.join(workdir, name)
+                index_db = os.path.join(workdir, f"{name}.index.sqlite")
+                command = [sys.executable, script, '--fetcher', 'replay', '--replay-dir', os.path.abspath(corpus_dir),
+                           '--base-url', golden['base_url'], '--no-vpn', '--no-cache', '--input', input_file,
+                           '--output', output, '--index-db', index_db, '--batch-size', '2',
+                           '--rate', '6000', '--burst', '10', '--metrics-file', '']
+                if mode == 'pipeline':
+                    command.append('--pipeline')
+                proc = subprocess.run(command, cwd=workdir, capture_output=True, text=True, encoding='utf-8')
+                with open_sink(output) as sink:
+                    written = sink.completed_pibs()
+                index = PibIndex(index_db)
+                hashed = {pib for pib in expected if index.content_hash(pib)}
+                index.close()
+
+                problems = []
+                if proc.returncode:
+                    problems.append(f"izlazni kod {proc.returncode}")
+                if 'Greška' in proc.stdout:
+                    problems.append("greška u ispisu")
+                if written != expected:
+                    problems.append(f"upisano {len(written & expected)}/{len(expected)}")
+                if hashed != expected:
+                    problems.append(f"hash u indeksu {len(hashed)}/{len(expected)}")
+                print(f"  {'✗' if problems else '✓'} {name}: {', '.join(problems) or 'ok'}")
+                errors += bool(problems)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return errors
+
+
+# ===== SNIMANJE KORPUSA =====
+
+def anonymize(html, replacements):
+    """Zameni email adrese i telefone doslednim izmišljenim vrednostima"""
+    def fake_email(match):
+        key = match.group(0).lower()
+        if key not in replacements:
+            replacements[key] = f"kontakt{len(replacements) + 1}@firma.me"
+        return replacements[key]
+
+    def fake_phone(match):
+        key = ''.join(ch for ch in match.group(0) if ch.isdigit())
+        if key not in replacements:
+            replacements[key] = f"067 000 {len(replacements) + 1:03d}"
+        return replacements[key]
+
+    return PHONE_SCAN_RE.sub(fake_phone, EMAIL_RE.sub(fake_email, html))
+
+
+def record_corpus(pibs, out_dir, cache_dir=DEFAULT_CACHE_DIR, index_db=DEFAULT_INDEX_DB, base_url=None):
+    """Prepiši stranice za date PIB-ove iz keša u korpus; zlatne vrednosti su trenutna ekstrakcija.
+
+    golden.json treba ručno pregledati i ispraviti pre nego što postane referenca.
+    """
+    from scraper_vpn import BASE_URL
+
+    base_url = base_url or BASE_URL
+    cache = PageCache(cache_dir, ttl_days=None, max_mb=None)
+    index = PibIndex(index_db)
+    os.makedirs(os.path.join(out_dir, 'pages'), exist_ok=True)
+    urls = {}
+    golden = {'base_url': base_url, 'synthetic': False, 'companies': []}
+    replacements = {}
+    try:
+        for pib in pibs:
+            search_url = f"{base_url}?n={pib}"
+            search_html = cache.get(search_url)
+            if search_html is None:
+                print(f"  ⚠ {pib}: pretraga nije u kešu, preskačem")
+                continue
+            name = f"pages/search_{pib}.html"
+            with open(os.path.join(out_dir, name), 'w', encoding='utf-8') as f:
+                f.write(anonymize(search_html, replacements))
+            urls[search_url] = name
+            entry = {'pib': pib, 'profile_url': None, 'expected': None}
+            profile_url = index.get(pib)
+            profile_html = cache.get(profile_url) if profile_url else None
+            if profile_html is not None:
+                profile_html = anonymize(profile_html, replacements)
+                name = f"pages/profile_{pib}.html"
+                with open(os.path.join(out_dir, name), 'w', encoding='utf-8') as f:
+                    f.write(profile_html)
+                urls[profile_url] = name
+                entry['profile_url'] = profile_url
+                entry['expected'] = parse_profile_html(profile_html, verbose=False)
+            golden['companies'].append(entry)
+    finally:
+        index.close()
+
+    with open(os.path.join(out_dir, REPLAY_MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump(urls, f, ensure_ascii=False, indent=2)
+    with open(os.path.join(out_dir, GOLDEN_FILE), 'w', encoding='utf-8') as f:
+        json.dump(golden, f, ensure_ascii=False, indent=2)
+    print(f"✓ Snimljeno {len(golden['companies'])} firmi u {out_dir} (pregledaj {GOLDEN_FILE})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark ekstrakcije i obrade rezultata na snimljenim stranicama')
+    parser.add_argument('command', nargs='?', default='run', choices=['run', 'record', 'check'],
+                        help='run: merenje i tačnost; record: napravi korpus iz keša stranica; '
+                             'check: ceo scraper (sa i bez --pipeline, CSV i SQLite)')
+    parser.add_argument('--corpus', default=DEFAULT_REPLAY_DIR, help='Folder sa korpusom (urls.json, golden.json)')
+    parser.add_argument('--scales', default=','.join(map(str, DEFAULT_SCALES)), help='Broj redova po merenju, npr. 1000,10000')
+    parser.add_argument('--save', help='Sačuvaj rezultat u JSON fajl')
+    parser.add_argument('--compare', help='Uporedi sa ranije sačuvanim rezultatom')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help='Dozvoljeno usporenje (0.25 = 25%%)')
+    parser.add_argument('--pibs', help='record: fajl sa PIB-ovima')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help='record: keš stranica')
+    parser.add_argument('--index-db', default=DEFAULT_INDEX_DB, help='record: indeks PIB → URL profila')
+    parser.add_argument('--out', help='record: izlazni folder korpusa')
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        if not args.pibs or not args.out:
+            parser.error('record zahteva --pibs i --out')
+        pibs, report = load_pibs(args.pibs)
+        report.print()
+        record_corpus(pibs, args.out, args.cache_dir, args.index_db)
+        return 0
+    if args.command == 'check':
+        print(f"Provera scraper-a na korpusu {args.corpus}")
+        return 1 if check_scraper(args.corpus) else 0
+
+    scales = [int(n) for n in args.scales.split(',') if n.strip()]
+    print(f"Benchmark na korpusu {args.corpus}: {', '.join(map(str, scales))} redova")
+    results = run_benchmarks(args.corpus, scales)
+    print_report(results)
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n✓ Rezultat sačuvan u {args.save}")
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        return 1 if compare_results(baseline, results, args.tolerance) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
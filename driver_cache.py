@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Keš putanje do chromedriver-a
+
+ChromeDriverManager().install() pri svakom pokretanju proverava verziju i
+često ide na mrežu. Ovde se putanja pamti u JSON fajlu zajedno sa glavnom
+verzijom Chrome-a (ili verzijom zadatom sa --chromedriver-version), pa se
+webdriver_manager poziva samo kada se verzija promeni ili fajl nestane.
+"""
+
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+from fileio import write_atomic
+
+DEFAULT_DRIVER_CACHE = "chromedriver_cache.json"
+CHROME_COMMANDS = ('google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser')
+WINDOWS_CHROME_KEYS = (r"Software\Google\Chrome\BLBeacon", r"Software\Chromium\BLBeacon")
+VERSION_RE = re.compile(r'(\d+)\.\d+\.\d+(?:\.\d+)?')
+
+
+def _major(version):
+    return version.split('.', 1)[0] if version else None
+
+
+def chrome_version():
+    """Instalirana verzija Chrome-a (registry na Windows-u, --version inače) ili None"""
+    if sys.platform == 'win32':
+        import winreg
+        for root in (winreg.HKEY_CURRENT_USER, winreg.HKEY_LOCAL_MACHINE):
+            for key in WINDOWS_CHROME_KEYS:
+                try:
+                    with winreg.OpenKey(root, key) as handle:
+                        return winreg.QueryValueEx(handle, 'version')[0]
+                except OSError:
+                    continue
+        return None
+    for command in CHROME_COMMANDS:
+        try:
+            output = subprocess.run([command, '--version'], capture_output=True, text=True, timeout=5).stdout
+        except (OSError, subprocess.SubprocessError):
+            continue
+        match = VERSION_RE.search(output)
+        if match:
+            return match.group(0)
+    return None
+
+
+def load_driver_cache(cache_file=DEFAULT_DRIVER_CACHE):
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_driver_cache(cache_file, entry):
+    write_atomic(cache_file, lambda f: json.dump(entry, f, indent=2))
+
+
+def resolve_chromedriver(cache_file=DEFAULT_DRIVER_CACHE, pin=None):
+    """Putanja do chromedriver-a ili None (tada Selenium sam traži driver).
+
+    pin: tačna verzija chromedriver-a; bez nje se keš vezuje za glavnu
+    verziju instaliranog Chrome-a.
+    """
+    wanted = pin or _major(chrome_version())
+    cached = load_driver_cache(cache_file)
+    path = cached.get('path')
+    if path and os.path.isfile(path) and (wanted is None or cached.get('version') == wanted):
+        return path
+
+    try:
+        from webdriver_manager.chrome import ChromeDriverManager
+    except ImportError:
+        return None
+    print(f"Preuzimam chromedriver{f' {pin}' if pin else ''}...")
+    path = ChromeDriverManager(driver_version=pin).install()
+    try:
+        save_driver_cache(cache_file, {'version': wanted, 'path': path, 'resolved_at': time.strftime('%Y-%m-%d %H:%M:%S')})
+    except OSError as e:
+        print(f"⚠ Keš chromedriver-a nije sačuvan: {e}")
+    return path
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Ekstrakcija podataka iz HTML-a profil stranice (bez browsera)
+
+Parsiranje ide preko lxml.html sa unapred kompajliranim XPath izrazima koji
+gađaju qanda-body blokove i kontakt sekcije. Regex preko teksta cele
+stranice koristi se samo kao rezerva kada polje nije nađeno u tim sekcijama.
+"""
+
+import re
+from urllib.parse import urljoin
+
+import lxml.html
+from lxml import etree
+
+from gazetteer import CITY_MATCHER
+from kd_codes import kd_table
+from phone_numbers import first_phone, parse_phone
+from run_metrics import NULL_TIMINGS
+from text_normalize import upper_key
+
+
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+QANDA_XPATH = etree.XPath(f"//div[{_has_class('qanda-body')}]")
+BOLD_XPATH = etree.XPath(f".//span[{_has_class('text-bold')}]")
+HEADING_XPATH = etree.XPath("//h1 | //h2 | //h3")
+# Linkovi se traže samo unutar kontakt i FAQ sekcija (relativno na element)
+MAILTO_XPATH = etree.XPath(".//a[starts-with(translate(@href, 'MAILTO', 'mailto'), 'mailto:')]/@href")
+TEL_XPATH = etree.XPath(".//a[starts-with(translate(@href, 'TEL', 'tel'), 'tel:')]/@href")
+# Cele klase (ne 'footer-contact'), i ništa iz zaglavlja, podnožja, menija ili bočne trake
+CONTACT_CLASSES = ('contact', 'kontakt', 'company-contact', 'contact-info')
+CONTACT_XPATH = etree.XPath(
+    f"//*[({' or '.join(_has_class(name) for name in CONTACT_CLASSES)} or @id = 'contact' or @id = 'kontakt')"
+    " and not(ancestor-or-self::header or ancestor-or-self::footer or ancestor-or-self::nav"
+    " or ancestor-or-self::aside)]"
+)
+PAGE_TEXT_XPATH = etree.XPath("//body//text()[not(ancestor::script) and not(ancestor::style) and not(ancestor::noscript)]")
+PROFILE_LINK_XPATH = etree.XPath("//a[contains(@href, '/firma/')]/@href")
+
+EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+EMAIL_SKIP = ('companywall', 'example', 'test', 'noreply')
+PRIHOD_RE = re.compile(r'([\d.,]+)')
+NUMBER_RE = re.compile(r'(\d+)')
+
+
+def parse_document(html):
+    """lxml stablo stranice"""
+    return lxml.html.document_fromstring(html)
+
+
+def extract_profile_link(html, base_url):
+    """Prvi /firma/ link sa stranice pretrage (apsolutni URL) ili None"""
+    if not html:
+        return None
+    hrefs = PROFILE_LINK_XPATH(parse_document(html))
+    return urljoin(base_url, hrefs[0]) if hrefs else None
+
+
+def _first_email(text):
+    for email in EMAIL_RE.findall(text):
+        if not any(skip in email.lower() for skip in EMAIL_SKIP):
+            return email
+    return ''
+
+
+class _PageText:
+    """Tekst cele stranice, računa se tek kada zatreba kao rezerva"""
+
+    def __init__(self, doc):
+        self.doc = doc
+        self._text = None
+
+    def __str__(self):
+        if self._text is None:
+            self._text = ' '.join(PAGE_TEXT_XPATH(self.doc))
+        return self._text
+
+
+def parse_profile_html(html, verbose=True, timings=NULL_TIMINGS):
+    """Izvuci podatke iz HTML-a profil stranice (timings meri trajanje svakog polja)"""
+    try:
+        with timings.phase('parse.dom'):
+            doc = parse_document(html)
+            page_text = _PageText(doc)
+
+        data = {'naziv': '', 'email': '', 'telefon': '', 'telefon_e164': '', 'telefon_tip': '', 'kd': '', 'kd_opis': '',
+                'prihod': '', 'broj_zaposlenih': '', 'grad': ''}
+
+        # ===== IZVUCI PODATKE IZ FAQ SEKCIJE (div.qanda-body) =====
+        with timings.phase('parse.faq'):
+            qanda_blocks = QANDA_XPATH(doc)
+            qanda_texts = []
+            for qanda in qanda_blocks:
+                text = qanda.text_content()
+                qanda_texts.append(text)
+                # Jedna normalizacija po bloku, koristi se za sve provere ispod
+                key = upper_key(text)
+
+                # Prihod
+                if 'PRIHOD' in key and not data['prihod']:
+                    bold_spans = BOLD_XPATH(qanda)
+                    if bold_spans:
+                        prihod_match = PRIHOD_RE.search(bold_spans[0].text_content())
+                        if prihod_match:
+                            data['prihod'] = prihod_match.group(1).replace('.', '').replace(',', '.')
+                            if verbose:
+                                print(f"    Prihod (FAQ): {data['prihod']}")
+
+                # Broj zaposlenih
+                if 'ZAPOSLENIH' in key and not data['broj_zaposlenih']:
+                    bold_spans = BOLD_XPATH(qanda)
+                    if bold_spans:
+                        broj_match = NUMBER_RE.search(bold_spans[0].text_content())
+                        if broj_match and len(broj_match.group(1)) < 6:
+                            data['broj_zaposlenih'] = broj_match.group(1)
+                            if verbose:
+                                print(f"    Broj zaposlenih (FAQ): {data['broj_zaposlenih']}")
+
+                # Grad/Adresa (jedan prolaz kroz gazetir)
+                if 'ADRESA' in key and not data['grad']:
+                    data['grad'] = CITY_MATCHER.match_keyed(key)
+                    if verbose and data['grad']:
+                        print(f"    Grad (FAQ): {data['grad']}")
+
+        # Tekst ciljanih sekcija: kontakt blokovi + FAQ odgovori
+        with timings.phase('parse.sections'):
+            contacts = CONTACT_XPATH(doc)
+            sections = contacts + qanda_blocks
+            # itertext sa razmakom: susedni <p> blokovi se ne lepe ('info@firma.meTelefon')
+            section_text = ' '.join([' '.join(el.itertext()) for el in contacts] + qanda_texts)
+
+        # ===== NAZIV =====
+        with timings.phase('parse.naziv'):
+            for tag in HEADING_XPATH(doc):
+                text = tag.text_content().strip()
+                if text and len(text) > 3 and 'REZULTATI' not in upper_key(text):
+                    data['naziv'] = text
+                    break
+
+        # ===== EMAIL =====
+        with timings.phase('parse.email'):
+            for href in (href for el in sections for href in MAILTO_XPATH(el)):
+                email = _first_email(href[len('mailto:'):].split('?')[0])
+                if email:
+                    data['email'] = email
+                    break
+            if not data['email']:
+                data['email'] = _first_email(section_text) or _first_email(str(page_text))
+
+        # ===== TELEFON =====
+        with timings.phase('parse.telefon'):
+            tel_hrefs = (href for el in sections for href in TEL_XPATH(el))
+            phone = next(filter(None, (parse_phone(href[len('tel:'):]) for href in tel_hrefs)), None)
+            phone = phone or first_phone(section_text) or first_phone(str(page_text))
+            if phone:
+                data['telefon'], data['telefon_e164'], data['telefon_tip'] = phone.local, phone.e164, phone.kind
+
+        # ===== KD (samo šifra uz oznaku u ciljanim sekcijama, provera kroz šifarnik) =====
+        with timings.phase('parse.kd'):
+            found = kd_table().find(section_text)
+            if found:
+                data['kd'], data['kd_opis'] = found
+
+        return data
+    except:
+        return None
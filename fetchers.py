@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Fetcher interfejs: odakle dolazi HTML stranice (Selenium, HTTP ili automatski izbor)
+
+Spremnost stranice se opisuje XPath izrazom, isti izraz koristi Selenium
+(By.XPATH) i lxml provera HTML-a dobijenog preko HTTP-a.
+"""
+
+import json
+import os
+import threading
+from functools import lru_cache
+
+import lxml.html
+from lxml import etree
+
+from run_metrics import NULL_TIMINGS
+
+DEFAULT_TIMEOUT = 8
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+FETCHER_BACKENDS = ('selenium', 'http', 'auto', 'replay')
+DEFAULT_REPLAY_DIR = "bench_fixtures"
+REPLAY_MANIFEST = "urls.json"
+
+
+class FetchResult:
+    """HTML stranice i URL na kome je završilo učitavanje (posle preusmerenja).
+
+    ready: da li se pojavio traženi element (ready_xpath); stranica bez
+    njega se ne čuva u kešu.
+    """
+
+    def __init__(self, html, url, ready=True):
+        self.html = html
+        self.url = url
+        self.ready = ready
+
+    @property
+    def blocked(self):
+        """Sajt preusmerava na registraciju kada blokira pristup"""
+        return 'registracija' in (self.url or '')
+
+
+class Fetcher:
+    """Osnovni interfejs: fetch(url) → FetchResult"""
+
+    name = 'base'
+
+    def fetch(self, url, ready_xpath=None, timeout=DEFAULT_TIMEOUT, timings=NULL_TIMINGS, phase='profile'):
+        raise NotImplementedError
+
+    def warm(self):
+        """Pripremi backend unapred (npr. pokreni browser); podrazumevano ništa"""
+
+    def close(self):
+        pass
+
+
+@lru_cache(maxsize=32)
+def _compiled_xpath(xpath):
+    return etree.XPath(xpath)
+
+
+def html_matches(html, xpath):
+    """Da li HTML sadrži element koji opisuje XPath"""
+    if not html:
+        return False
+    try:
+        return bool(_compiled_xpath(xpath)(lxml.html.document_fromstring(html)))
+    except (etree.ParserError, etree.XPathError):
+        return False
+
+
+class SeleniumFetcher(Fetcher):
+    """Učitavanje kroz Chrome; driver se pravi tek pri prvom zahtevu"""
+
+    name = 'selenium'
+
+    def __init__(self, driver_factory):
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.common.exceptions import TimeoutException
+        self._By = By
+        self._WebDriverWait = WebDriverWait
+        self._TimeoutException = TimeoutException
+        self.driver_factory = driver_factory
+        self._driver = None
+        self._warmup = None
+
+    def warm(self):
+        """Pokreni Chrome u pozadinskoj niti; prvi pristup driver-u čeka na nju"""
+        if self._driver is None and self._warmup is None:
+            self._warmup = threading.Thread(target=self._start_driver, name="warm-chrome", daemon=True)
+            self._warmup.start()
+
+    def _start_driver(self):
+        self._driver = self.driver_factory()
+
+    @property
+    def driver(self):
+        if self._warmup is not None:
+            self._warmup.join()
+            self._warmup = None
+        elif self._driver is None:
+            self._start_driver()
+        if self._driver is None:
+            raise RuntimeError("Chrome nije pokrenut")
+        return self._driver
+
+    def wait_for(self, xpath, timeout=DEFAULT_TIMEOUT):
+        """Čekaj da se pojavi traženi element (ili preusmerenje na registraciju)"""
+        def ready(drv):
+            if 'registracija' in drv.current_url:
+                return True
+            return len(drv.find_elements(self._By.XPATH, xpath)) > 0
+
+        try:
+            self._WebDriverWait(self.driver, timeout, poll_frequency=0.2).until(ready)
+            return True
+        except self._TimeoutException:
+            return False
+
+    def fetch(self, url, ready_xpath=None, timeout=DEFAULT_TIMEOUT, timings=NULL_TIMINGS, phase='profile'):
+        with timings.phase(f'{phase}.navigation'):
+            self.driver.get(url)
+            ready = self.wait_for(ready_xpath, timeout) if ready_xpath else True
+        with timings.phase(f'{phase}.page_source'):
+            html = self.driver.page_source
+        return FetchResult(html, self.driver.current_url, ready)
+
+    def close(self):
+        if self._warmup is not None:
+            self._warmup.join()
+            self._warmup = None
+        if self._driver is not None:
+            self._driver.quit()
+            self._driver = None
+
+
+class HttpFetcher(Fetcher):
+    """Običan HTTP: jedna sesija sa keep-alive pool-om konekcija i gzip kompresijom"""
+
+    name = 'http'
+
+    def __init__(self, pool_size=4, user_agent=USER_AGENT):
+        import requests
+        from requests.adapters import HTTPAdapter
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=1)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'User-Agent': user_agent,
+            'Accept': 'text/html,application/xhtml+xml',
+            'Accept-Encoding': 'gzip, deflate',
+            'Accept-Language': 'sr-Latn-ME,sr;q=0.9,en;q=0.8',
+            'Connection': 'keep-alive',
+        })
+
+    def fetch(self, url, ready_xpath=None, timeout=DEFAULT_TIMEOUT, timings=NULL_TIMINGS, phase='profile'):
+        with timings.phase(f'{phase}.navigation'):
+            response = self.session.get(url, timeout=timeout)
+            response.raise_for_status()
+            html = response.text
+        return FetchResult(html, response.url, not ready_xpath or html_matches(html, ready_xpath))
+
+    def close(self):
+        self.session.close()
+
+
+class AutoFetcher(Fetcher):
+    """Prvo probaj HTTP; ako stranica nema traženi sadržaj, učitaj je kroz Selenium.
+
+    Kada HTTP ne uspe nijednom u prvih `probe_limit` pokušaja, ostatak
+    rada ide direktno kroz Selenium.
+    """
+
+    name = 'auto'
+
+    def __init__(self, http, selenium, probe_limit=3):
+        self.http = http
+        self.selenium = selenium
+        self.probe_limit = probe_limit
+        self.use_http = True
+        self.http_hits = 0
+        self.http_misses = 0
+
+    def fetch(self, url, ready_xpath=None, timeout=DEFAULT_TIMEOUT, timings=NULL_TIMINGS, phase='profile'):
+        if self.use_http:
+            try:
+                result = self.http.fetch(url, ready_xpath, timeout, timings, phase)
+                if not result.blocked and result.ready:
+                    self.http_hits += 1
+                    return result
+            except Exception:
+                pass
+            self.http_misses += 1
+            if self.http_hits == 0 and self.http_misses >= self.probe_limit:
+                print("  ⚠ HTTP ne vraća potreban sadržaj, prelazim na Selenium")
+                self.use_http = False
+        return self.selenium.fetch(url, ready_xpath, timeout, timings, phase)
+
+    def close(self):
+        self.http.close()
+        self.selenium.close()
+
+
+class ReplayFetcher(Fetcher):
+    """Snimljene stranice umesto sajta (benchmark, rad bez mreže)
+
+    `pages` je bilo šta sa .get(url) → HTML ili None (dict, PageCache...).
+    URL koji nije snimljen daje LookupError, kao neuspelo učitavanje.
+    Snimljena stranica se smatra gotovom (ready), bez provere ready_xpath.
+    """
+
+    name = 'replay'
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.misses = 0
+
+    @classmethod
+    def from_dir(cls, corpus_dir=DEFAULT_REPLAY_DIR):
+        """Učitaj korpus: urls.json (URL → relativna putanja HTML fajla) u folderu"""
+        with open(os.path.join(corpus_dir, REPLAY_MANIFEST), 'r', encoding='utf-8') as f:
+            files = json.load(f)
+        pages = {}
+        for url, name in files.items():
+            with open(os.path.join(corpus_dir, name), 'r', encoding='utf-8') as f:
+                pages[url] = f.read()
+        return cls(pages)
+
+    def fetch(self, url, ready_xpath=None, timeout=DEFAULT_TIMEOUT, timings=NULL_TIMINGS, phase='profile'):
+        with timings.phase(f'{phase}.navigation'):
+            html = self.pages.get(url)
+        if html is None:
+            self.misses += 1
+            raise LookupError(f"Stranica nije snimljena: {url}")
+        return FetchResult(html, url)
+
+
+def create_fetcher(backend, driver_factory, pool_size=4, replay_dir=DEFAULT_REPLAY_DIR):
+    """Napravi fetcher za izabrani backend ('selenium', 'http', 'auto' ili 'replay')"""
+    if backend == 'replay':
+        return ReplayFetcher.from_dir(replay_dir)
+    if backend == 'http':
+        return HttpFetcher(pool_size)
+    if backend == 'auto':
+        return AutoFetcher(HttpFetcher(pool_size), SeleniumFetcher(driver_factory))
+    return SeleniumFetcher(driver_factory)
@@ -1,123 +1,159 @@
+import argparse
+
 import pandas as pd
-import os
 
-def format_all_data():
-    # Učitaj CSV fajl
-    df = pd.read_csv('rezultati.csv')
-    
-    print(f"Ukupno redova: {len(df)}")
-    
-    # Funkcija za formatiranje PIB-a (8 cifara sa vodećim nulama)
-    def format_pib(pib):
-        if pd.isna(pib) or pib == '':
-            return pib
-        
-        # Konvertuj u string i ukloni decimalne delove ako postoje
-        pib_str = str(pib)
-        if '.' in pib_str:
-            pib_str = pib_str.split('.')[0]
-        
-        # Dodaj nule na početak da bude 8 cifara
-        return pib_str.zfill(8)
-    
-    # Funkcija za formatiranje telefona
-    def format_phone(phone):
-        if pd.isna(phone) or phone == '':
-            return phone
-        
-        # Konvertuj u string i ukloni .0 ako postoji
-        phone_str = str(phone)
-        if phone_str.endswith('.0'):
-            phone_str = phone_str[:-2]
-        
-        # Ako počinje sa 67, 68 ili 69, dodaj 0 na početak
-        if phone_str.startswith(('67', '68', '69')):
-            return '0' + phone_str
-        
-        return phone_str
-    
-    # Funkcija za formatiranje KD (šifre delatnosti)
-    def format_kd(kd):
-        if pd.isna(kd) or kd == '':
-            return kd
-        
-        kd_str = str(kd)
-        if kd_str.endswith('.0'):
-            return kd_str[:-2]
-        
-        return kd_str
-    
-    # Funkcija za zamenu dijakritika
-    def replace_diacritics_text(text):
-        if pd.isna(text) or text == '':
-            return text
-        
-        # Mapa za zamenu dijakritičkih znakova
-        diacritic_map = {
-            'š': 's', 'Š': 'S',
-            'č': 'c', 'Č': 'C', 
-            'ć': 'c', 'Ć': 'C',
-            'đ': 'dj', 'Đ': 'Dj',
-            'ž': 'z', 'Ž': 'Z'
-        }
-        
-        text_str = str(text)
-        for old, new in diacritic_map.items():
-            text_str = text_str.replace(old, new)
-        
-        return text_str
-    
-    # Prebrojimo koliko ima problema
-    pib_issues = sum(1 for pib in df['pib'] if pd.notna(pib) and (len(str(pib).split('.')[0]) != 8 or '.' in str(pib)))
-    phone_issues = sum(1 for phone in df['telefon'] if pd.notna(phone) and ('.0' in str(phone) or str(phone).replace('.0', '').startswith(('67', '68', '69'))))
-    kd_issues = sum(1 for kd in df['kd'] if pd.notna(kd) and '.0' in str(kd))
-    diacritic_issues = sum(1 for naziv in df['naziv'] if pd.notna(naziv) and any(char in str(naziv) for char in 'šščćđžŠŠČĆĐŽ'))
-    
-    print(f"PIB brojeva za formatiranje: {pib_issues}")
-    print(f"Telefona za formatiranje: {phone_issues}")
-    print(f"KD kodova za formatiranje: {kd_issues}")
-    print(f"Naziva sa dijakriticima: {diacritic_issues}")
-    
-    # Primeni sve formatiranje
-    df['pib'] = df['pib'].apply(format_pib)
-    df['telefon'] = df['telefon'].apply(format_phone)
-    df['kd'] = df['kd'].apply(format_kd)
-    
-    # Primeni zamenu dijakritika na tekstualne kolone
-    text_columns = ['naziv', 'grad', 'email', 'web']
-    for col in text_columns:
+from fileio import write_atomic
+from gazetteer import match_city_series
+from kd_codes import kd_table, set_kd_table
+from phone_numbers import normalize_phone_series
+from result_export import open_exports
+from text_normalize import has_diacritics_series, strip_diacritics_series
+
+TEXT_COLUMNS = ['naziv', 'grad', 'email', 'web', 'kd_opis']
+
+
+def format_frame(df):
+    """Formatira DataFrame učitan sa dtype=str i vraća broj problema po koloni.
+
+    Sve je vektorizovano: maske za brojanje problema su iste one koje se
+    koriste za ispravku.
+    """
+    issues = {'pib': 0, 'telefon': 0, 'kd': 0, 'naziv': 0}
+
+    # PIB: 8 cifara sa vodećim nulama, bez decimalnog dela
+    if 'pib' in df.columns:
+        pib = df['pib']
+        has_decimal = pib.str.contains('.', regex=False, na=False)
+        pib_base = pib.str.replace(r'\..*$', '', regex=True)
+        issues['pib'] = int((pib.notna() & (has_decimal | (pib_base.str.len() != 8))).sum())
+        df['pib'] = pib_base.where(pib_base.isna() | (pib_base == ''), pib_base.str.zfill(8))
+
+    # Telefon: kanonski lokalni oblik (067123456), uz E.164 i vrstu broja.
+    # Neprepoznate vrednosti ostaju kakve jesu.
+    if 'telefon' in df.columns:
+        phone = df['telefon']
+        parsed = normalize_phone_series(phone)
+        valid = parsed['local'].notna()
+        issues['telefon'] = int((valid & (parsed['local'] != phone)).sum())
+        df['telefon'] = parsed['local'].where(valid, phone)
+        for col, values in (('telefon_e164', parsed['e164']), ('telefon_tip', parsed['kind'])):
+            df[col] = values.where(valid, df[col]) if col in df.columns else values
+
+    # KD (šifra delatnosti): bez '.0'
+    if 'kd' in df.columns:
+        kd = df['kd']
+        issues['kd'] = int(kd.str.contains('.0', regex=False, na=False).sum())
+        df['kd'] = kd.str.replace(r'\.0$', '', regex=True)
+        # Naziv djelatnosti iz šifarnika gde ga nema (stariji rezultati)
+        opis = df['kd'].map(kd_table().codes)
+        if 'kd_opis' in df.columns:
+            df['kd_opis'] = df['kd_opis'].mask(df['kd_opis'].isna() | (df['kd_opis'] == ''), opis)
+        else:
+            df['kd_opis'] = opis
+
+    # Grad: kanonski naziv opštine iz gazetira (npr. 'Herceg-Novi', '81000 Podgorica')
+    if 'grad' in df.columns:
+        df['grad'] = match_city_series(df['grad'])
+
+    # Zamena dijakritika na tekstualnim kolonama
+    if 'naziv' in df.columns:
+        issues['naziv'] = int(has_diacritics_series(df['naziv']).sum())
+    for col in TEXT_COLUMNS:
         if col in df.columns:
-            df[col] = df[col].apply(replace_diacritics_text)
-    
+            df[col] = strip_diacritics_series(df[col])
+
+    return df, issues
+
+
+def print_issues(issues):
+    print(f"PIB brojeva za formatiranje: {issues['pib']}")
+    print(f"Telefona za formatiranje: {issues['telefon']}")
+    print(f"KD kodova za formatiranje: {issues['kd']}")
+    print(f"Naziva sa dijakriticima: {issues['naziv']}")
+
+
+def print_exports(exports):
+    for export in exports:
+        print(f"Izvezeno {export.written} redova u {export.path}")
+
+
+def format_all_data(input_file='rezultati.csv', chunk_size=None, exports=()):
+    """Formatira rezultate; sa chunk_size obrađuje fajl deo po deo (ograničena memorija).
+
+    exports: izvozi iz result_export (SQLite/Parquet) koji dobijaju formatirane redove.
+    """
+    if chunk_size:
+        return format_all_data_chunked(input_file, chunk_size, exports)
+
+    # Učitaj CSV fajl; sve kolone kao tekst da PIB/telefon/KD ne postanu float
+    df = pd.read_csv(input_file, dtype=str)
+
+    print(f"Ukupno redova: {len(df)}")
+
+    df, issues = format_frame(df)
+    print_issues(issues)
+
     print("\nFormatiranje završeno!")
-    
+
     # Prikaži prvih nekoliko redova
     print("\nPrvih 5 redova nakon formatiranja:")
-    print(df[['naziv', 'pib', 'telefon', 'kd']].head())
-    
-    # Sačuvaj izmenjeni fajl
-    df.to_csv('rezultati.csv', index=False)
+    print(df[[col for col in ['naziv', 'pib', 'telefon', 'kd'] if col in df.columns]].head())
+
+    # Sačuvaj izmenjeni fajl (atomski, original ostaje ceo ako upis pukne)
+    write_atomic(input_file, lambda f: df.to_csv(f, index=False))
     print("\nFajl je uspešno sačuvan!")
 
-def cleanup_scripts():
-    # Lista skripti za brisanje
-    scripts_to_delete = [
-        'remove_duplicates.py',
-        'fix_pib.py', 
-        'fix_decimals.py',
-        'fix_phones.py',
-        'fix_complete.py'
-    ]
-    
-    print("\nBrisanje starih skripti...")
-    for script in scripts_to_delete:
-        if os.path.exists(script):
-            os.remove(script)
-            print(f"Obrisana: {script}")
-        else:
-            print(f"Nije pronađena: {script}")
+    for export in exports:
+        export.write(df)
+    print_exports(exports)
+
+
+def format_all_data_chunked(input_file, chunk_size, exports=()):
+    """Streaming režim: čita po chunk_size redova, brojače sabira kroz sve delove"""
+    def write_chunks(f):
+        totals = {'pib': 0, 'telefon': 0, 'kd': 0, 'naziv': 0}
+        rows = 0
+        for i, chunk in enumerate(pd.read_csv(input_file, dtype=str, chunksize=chunk_size)):
+            chunk, issues = format_frame(chunk)
+            for key, count in issues.items():
+                totals[key] += count
+            if i == 0:
+                print("\nPrvih 5 redova nakon formatiranja:")
+                print(chunk[[col for col in ['naziv', 'pib', 'telefon', 'kd'] if col in chunk.columns]].head())
+            chunk.to_csv(f, index=False, header=(i == 0))
+            for export in exports:
+                export.write(chunk)
+            rows += len(chunk)
+        return rows, totals
+
+    rows, issues = write_atomic(input_file, write_chunks)
+
+    print(f"\nUkupno redova: {rows} (delovi po {chunk_size})")
+    print_issues(issues)
+    print("\nFormatiranje završeno! Fajl je uspešno sačuvan!")
+    print_exports(exports)
+
 
 if __name__ == "__main__":
-    format_all_data()
-    cleanup_scripts()
-    print("\nSve gotovo! Svi podaci su formatiri i stare skripte su obrisane.")
\ No newline at end of file
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--input', default='rezultati.csv')
+    parser.add_argument('--chunk-size', type=int, help='Obradi fajl u delovima od N redova (za velike fajlove)')
+    parser.add_argument('--kd-table', help='CSV šifarnik djelatnosti (kolone sifra, naziv) umesto ugrađenog KD 2010')
+    parser.add_argument('--sqlite', help='Izvoz u SQLite bazu (tipizirane kolone, indeksi na pib, kd i grad)')
+    parser.add_argument('--parquet', help='Izvoz u Parquet folder (zahteva pyarrow)')
+    parser.add_argument('--append', action='store_true', help='Dopuni postojeći izvoz umesto da ga pišeš iznova')
+    args = parser.parse_args()
+    if args.kd_table:
+        set_kd_table(args.kd_table)
+
+    try:
+        exports = open_exports(args.sqlite, args.parquet, args.append)
+    except Exception as e:
+        print(f"✗ Greška pri otvaranju izvoza: {e}")
+        raise SystemExit(1)
+    try:
+        format_all_data(args.input, args.chunk_size, exports)
+    finally:
+        for export in exports:
+            export.close()
+    print("\nSve gotovo! Svi podaci su formatirani (duplikate po PIB-u spaja merge_results.py).")
\ No newline at end of file
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Gazetir crnogorskih opština i naselja sa jednoprolaznim prepoznavanjem grada
+
+Sva imena se kompajliraju u jedan regex (alternacija, duža imena prva) nad
+tekstom bez dijakritika i velikim slovima, sa granicama reči, pa se adresni
+blok skenira samo jednom i 'BAR' ne pogađa npr. 'BARSKA' ili 'BARBER'.
+"""
+
+import re
+from functools import lru_cache
+
+from text_normalize import upper_key
+
+# Opštine (kanonski naziv koji ide u kolonu grad)
+MUNICIPALITIES = [
+    'ANDRIJEVICA', 'BAR', 'BERANE', 'BIJELO POLJE', 'BUDVA', 'CETINJE', 'DANILOVGRAD',
+    'GUSINJE', 'HERCEG NOVI', 'KOLAŠIN', 'KOTOR', 'MOJKOVAC', 'NIKŠIĆ', 'PETNJICA', 'PLAV',
+    'PLJEVLJA', 'PLUŽINE', 'PODGORICA', 'ROŽAJE', 'ŠAVNIK', 'TIVAT', 'TUZI', 'ULCINJ',
+    'ZETA', 'ŽABLJAK',
+]
+
+# Naselja i varijante naziva → opština
+SETTLEMENTS = {
+    'SUTOMORE': 'BAR', 'STARI BAR': 'BAR', 'VIRPAZAR': 'BAR', 'OSTROS': 'BAR', 'ŠUŠANJ': 'BAR',
+    'ČANJ': 'BAR', 'DOBRA VODA': 'BAR',
+    'BEČIĆI': 'BUDVA', 'PETROVAC': 'BUDVA', 'PETROVAC NA MORU': 'BUDVA', 'RAFAILOVIĆI': 'BUDVA',
+    'SVETI STEFAN': 'BUDVA', 'PRŽNO': 'BUDVA',
+    'IGALO': 'HERCEG NOVI', 'ZELENIKA': 'HERCEG NOVI', 'KUMBOR': 'HERCEG NOVI',
+    'ĐENOVIĆI': 'HERCEG NOVI', 'BAOŠIĆI': 'HERCEG NOVI', 'BIJELA': 'HERCEG NOVI',
+    'MELJINE': 'HERCEG NOVI', 'KAMENARI': 'HERCEG NOVI',
+    'DOBROTA': 'KOTOR', 'PRČANJ': 'KOTOR', 'RISAN': 'KOTOR', 'PERAST': 'KOTOR', 'MUO': 'KOTOR',
+    'RADANOVIĆI': 'KOTOR', 'MORINJ': 'KOTOR', 'STOLIV': 'KOTOR',
+    'DONJA LASTVA': 'TIVAT', 'RADOVIĆI': 'TIVAT', 'KRAŠIĆI': 'TIVAT', 'LEPETANE': 'TIVAT',
+    'VLADIMIR': 'ULCINJ', 'ŠTOJ': 'ULCINJ', 'ADA BOJANA': 'ULCINJ',
+    'GOLUBOVCI': 'ZETA',
+    'BIOČE': 'PODGORICA', 'LIJEVA RIJEKA': 'PODGORICA', 'GLAVNI GRAD PODGORICA': 'PODGORICA',
+    'SPUŽ': 'DANILOVGRAD',
+    'RIJEKA CRNOJEVIĆA': 'CETINJE', 'NJEGUŠI': 'CETINJE', 'ČEVO': 'CETINJE',
+    'PRIJESTONICA CETINJE': 'CETINJE',
+    'GRAHOVO': 'NIKŠIĆ', 'VILUSI': 'NIKŠIĆ',
+    'MURINO': 'PLAV',
+}
+
+class CityMatcher:
+    """Sva imena iz gazetira u jednom regexu; vraća kanonski naziv opštine"""
+
+    def __init__(self, municipalities=MUNICIPALITIES, settlements=SETTLEMENTS):
+        self.canonical = {upper_key(name): name for name in municipalities}
+        for name, municipality in settlements.items():
+            self.canonical[upper_key(name)] = municipality
+        # Duža imena prva, da 'STARI BAR' pobedi 'BAR' na istoj poziciji
+        alternation = '|'.join(re.escape(key) for key in sorted(self.canonical, key=len, reverse=True))
+        self.pattern = re.compile(rf'(?<![A-Z0-9])(?:{alternation})(?![A-Z0-9])')
+
+    def find_all(self, text):
+        """Sve opštine pomenute u tekstu, redom pojavljivanja"""
+        if not text:
+            return []
+        return self.find_all_keyed(upper_key(text))
+
+    def find_all_keyed(self, key):
+        """Isto kao find_all, za tekst koji je već prošao kroz upper_key"""
+        return [self.canonical[m.group(0)] for m in self.pattern.finditer(key)]
+
+    def match(self, text):
+        """Opština iz adrese; uzima se poslednje pominjanje jer adresa završava gradom"""
+        return self.match_keyed(upper_key(text)) if text else ''
+
+    def match_keyed(self, key):
+        """Isto kao match, za tekst koji je već prošao kroz upper_key"""
+        found = self.find_all_keyed(key)
+        return found[-1] if found else ''
+
+
+CITY_MATCHER = CityMatcher()
+
+
+@lru_cache(maxsize=4096)
+def match_city(text):
+    """Kanonski naziv opštine iz teksta adrese ili '' ako nije prepoznata"""
+    return CITY_MATCHER.match(text)
+
+
+def match_city_series(series):
+    """Vektorizovana varijanta za pandas: svaka jedinstvena vrednost se obrađuje jednom.
+
+    Vrednosti koje nisu prepoznate ostaju nepromenjene.
+    """
+    uniques = series.dropna().unique()
+    if len(uniques) == 0:
+        return series
+    mapping = {value: match_city(value) or value for value in uniques}
+    return series.map(mapping).astype(series.dtype)
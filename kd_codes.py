@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Šifarnik djelatnosti (KD 2010, usklađen sa NACE Rev. 2) i prepoznavanje KD šifre
+
+Tabela se učitava jednom u zamrznut dict (šifra od 4 cifre → naziv), pa je
+provera kandidata jedan lookup. Kandidati se uzimaju samo iza oznake
+('KD', 'Šifra djelatnosti', 'Djelatnost'), a ne bilo koji 4-cifreni broj
+sa stranice, koji je često godina ili poštanski broj. Prednost ima oblik
+NN.NN ili šifra odmah iza oznake ('KD: 4941'); broj iza koga sledi
+'. ' ili 'god' je godina i ne uzima se.
+"""
+
+import csv
+import os
+import re
+from functools import lru_cache
+from types import MappingProxyType
+
+DEFAULT_KD_TABLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "kd_2010.csv")
+
+KD_LABEL_RE = re.compile(r'\bKD\b|\bD[JI]?ELATNOST\w*', re.IGNORECASE)
+KD_CODE_RE = re.compile(r'(?<![\d.,])(\d{2})(\.?)(\d{2})(?!\d|[.,]\d)')  # ne deo većeg broja
+KD_YEAR_RE = re.compile(r'\.?\s*god', re.IGNORECASE)  # '2020. godine', '2015 god.'
+KD_PERIOD_RE = re.compile(r'\.(?:\s|$)')  # '... registrovana 2020. '
+KD_GAP_RE = re.compile(r'[\s:\-–]*')  # između oznake i šifre koja odmah sledi
+KD_WINDOW = 60  # koliko znakova iza oznake se traži šifra
+
+
+def normalize_kd(code):
+    """Šifra kao 4 cifre: '49.41' → '4941', '4941.0' → '4941'"""
+    code = str(code).strip()
+    if code.endswith('.0'):
+        code = code[:-2]
+    return code.replace('.', '')
+
+
+class KdTable:
+    """Šifre djelatnosti u zamrznutom dict-u; provera šifre je O(1)"""
+
+    def __init__(self, codes):
+        self.codes = MappingProxyType({normalize_kd(code): name for code, name in codes.items()})
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __contains__(self, code):
+        return normalize_kd(code) in self.codes
+
+    def describe(self, code):
+        """Naziv djelatnosti za šifru ili '' ako šifra ne postoji"""
+        return self.codes.get(normalize_kd(code), '')
+
+    def find(self, text):
+        """Važeća šifra uz oznaku u tekstu: (šifra, naziv) ili None.
+
+        Prva šifra u obliku NN.NN ili odmah iza oznake; ako takve nema, prva
+        četvorocifrena šifra u prozoru iza oznake koja ne izgleda kao godina.
+        """
+        if not text:
+            return None
+        fallback = None
+        for label in KD_LABEL_RE.finditer(text):
+            for match in KD_CODE_RE.finditer(text, label.end(), label.end() + KD_WINDOW):
+                code = match.group(1) + match.group(3)
+                name = self.codes.get(code)
+                if name is None:
+                    continue
+                if match.group(2):
+                    return code, name
+                if KD_YEAR_RE.match(text, match.end()):
+                    continue
+                if KD_GAP_RE.fullmatch(text, label.end(), match.start()):
+                    return code, name
+                if fallback is None and not KD_PERIOD_RE.match(text, match.end()):
+                    fallback = (code, name)
+        return fallback
+
+
+@lru_cache(maxsize=4)
+def load_kd_table(path=DEFAULT_KD_TABLE):
+    """Učitaj CSV šifarnik (kolone sifra, naziv); isti fajl se čita samo jednom"""
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        return KdTable({row['sifra']: row['naziv'].strip() for row in csv.DictReader(f) if row.get('sifra')})
+
+
+_table_path = DEFAULT_KD_TABLE
+
+
+def set_kd_table(path):
+    """Koristi drugi šifarnik (--kd-table); učitava ga odmah da greška izađe na početku"""
+    global _table_path
+    table = load_kd_table(path)
+    _table_path = path
+    return table
+
+
+def kd_table():
+    """Aktivni šifarnik"""
+    return load_kd_table(_table_path)
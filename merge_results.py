@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Inkrementalno spajanje rezultata po PIB-u (bez duplikata)
+
+Glavni skup se drži u hash indeksu po normalizovanom PIB-u, pa spajanje nove
+serije košta O(broj novih redova). Za CSV glavni fajl indeks se gradi jednim
+prolazom pri učitavanju, a fajl se atomski prepisuje samo jednom, u close(),
+bez obzira na broj serija; za SQLite glavni fajl indeks je primarni ključ
+tabele i ništa se ne učitava unapred.
+"""
+
+import argparse
+import csv
+import os
+import sqlite3
+
+from fileio import write_atomic
+from pib_utils import normalize_pib
+from result_sink import RESULT_COLUMNS, SqliteSink
+
+PREFER_NEW = 'prefer_new'   # neprazna nova vrednost zamenjuje staru
+KEEP_OLD = 'keep_old'       # nova vrednost samo popunjava prazno polje
+REPLACE = 'replace'         # novi red važi ceo, i prazna vrednost briše staru
+FIELD_RULES = (PREFER_NEW, KEEP_OLD, REPLACE)
+
+
+class MergeStats:
+    """Broj ubačenih, izmenjenih, nepromenjenih i preskočenih (bez PIB-a) redova"""
+
+    def __init__(self):
+        self.inserted = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.skipped = 0
+
+    def add(self, outcome):
+        setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def __iadd__(self, other):
+        self.inserted += other.inserted
+        self.updated += other.updated
+        self.unchanged += other.unchanged
+        self.skipped += other.skipped
+        return self
+
+    def __str__(self):
+        text = f"ubačeno {self.inserted}, izmenjeno {self.updated}, nepromenjeno {self.unchanged}"
+        return text + (f", bez PIB-a {self.skipped}" if self.skipped else "")
+
+
+def _is_empty(value):
+    return value is None or str(value).strip() == ''
+
+
+def merge_fields(old, new, rules, default_rule=PREFER_NEW):
+    """Spoji dva reda po pravilima polja; vraća (spojeni red, da li je bilo izmena)"""
+    merged = dict(old)
+    changed = False
+    for field, value in new.items():
+        if field == 'pib':
+            continue
+        rule = rules.get(field, default_rule)
+        if _is_empty(value) and rule != REPLACE:
+            continue
+        current = merged.get(field)
+        if rule == KEEP_OLD and not _is_empty(current):
+            continue
+        if current != value:
+            merged[field] = value
+            changed = True
+    return merged, changed
+
+
+class CsvMaster:
+    """Glavni CSV fajl učitan u dict indeks PIB → red
+
+    Redovi bez PIB-a se ne spajaju, ali ostaju u fajlu na svom mestu.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.columns = list(RESULT_COLUMNS)
+        self.rows = {}
+        self.dirty = False
+
+    def load(self, merge_row):
+        """Učitaj postojeći fajl; duplikati unutar njega se spajaju istim pravilima"""
+        if not os.path.isfile(self.path):
+            return MergeStats()
+        with open(self.path, 'r', newline='', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            self.columns = list(reader.fieldnames or self.columns)
+            stats = MergeStats()
+            for row in reader:
+                if _is_empty(row.get('pib')):
+                    # Ključ koji nijedan PIB ne može da pogodi
+                    self.rows[(None, len(self.rows))] = row
+                    stats.add('skipped')
+                else:
+                    stats.add(merge_row(row))
+        self.dirty = stats.updated > 0 or stats.unchanged > 0  # bilo je duplikata
+        return stats
+
+    def get(self, pib):
+        return self.rows.get(pib)
+
+    def put(self, pib, row):
+        for field in row:
+            if field not in self.columns:
+                self.columns.append(field)
+        self.rows[pib] = row
+        self.dirty = True
+
+    def commit(self):
+        if not self.dirty:
+            return
+
+        def write_rows(f):
+            writer = csv.DictWriter(f, fieldnames=self.columns, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(self.rows.values())
+
+        write_atomic(self.path, write_rows)
+        self.dirty = False
+
+    def close(self):
+        pass
+
+
+class SqliteMaster:
+    """Glavni SQLite fajl (ista šema kao SqliteSink); PIB je primarni ključ"""
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        cols = ", ".join(f"{col} TEXT" for col in RESULT_COLUMNS if col != 'pib')
+        self.conn.execute(f"CREATE TABLE IF NOT EXISTS {SqliteSink.TABLE} (pib TEXT PRIMARY KEY, {cols})")
+        self.columns = [row[1] for row in self.conn.execute(f"PRAGMA table_info({SqliteSink.TABLE})")]
+
+    def load(self, merge_row):
+        return MergeStats()
+
+    def get(self, pib):
+        row = self.conn.execute(f"SELECT * FROM {SqliteSink.TABLE} WHERE pib = ?", (pib,)).fetchone()
+        return dict(row) if row else None
+
+    def put(self, pib, row):
+        for field in row:
+            if field not in self.columns:
+                self.conn.execute(f'ALTER TABLE {SqliteSink.TABLE} ADD COLUMN "{field}" TEXT')
+                self.columns.append(field)
+        fields = list(row)
+        quoted = ', '.join(f'"{field}"' for field in fields)
+        placeholders = ', '.join('?' for _ in fields)
+        self.conn.execute(
+            f"INSERT OR REPLACE INTO {SqliteSink.TABLE} ({quoted}) VALUES ({placeholders})",
+            [row[field] for field in fields],
+        )
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+
+class ResultMerger:
+    """Spaja nove serije u glavni skup po normalizovanom PIB-u"""
+
+    def __init__(self, master_path, rules=None, default_rule=PREFER_NEW):
+        self.rules = rules or {}
+        self.default_rule = default_rule
+        if master_path.lower().endswith(('.sqlite', '.sqlite3', '.db')):
+            self.master = SqliteMaster(master_path)
+        else:
+            self.master = CsvMaster(master_path)
+        self.duplicates = self.master.load(self.merge_row)
+
+    def merge_row(self, row):
+        """Spoji jedan red; vraća 'inserted', 'updated', 'unchanged' ili 'skipped' (nema PIB)"""
+        if _is_empty(row.get('pib')):
+            return 'skipped'
+        pib = normalize_pib(row['pib'])
+        row = {field: ('' if value is None else value) for field, value in row.items() if field}
+        row['pib'] = pib
+        old = self.master.get(pib)
+        if old is None:
+            self.master.put(pib, row)
+            return 'inserted'
+        merged, changed = merge_fields(old, row, self.rules, self.default_rule)
+        if not changed:
+            return 'unchanged'
+        self.master.put(pib, merged)
+        return 'updated'
+
+    def merge_batch(self, rows):
+        """Spoji seriju redova (dict-ovi); košta O(len(rows)), glavni fajl se upisuje tek u close()"""
+        stats = MergeStats()
+        for row in rows:
+            stats.add(self.merge_row(row))
+        return stats
+
+    def merge_file(self, path):
+        """Spoji CSV fajl sa novim rezultatima"""
+        with open(path, 'r', newline='', encoding='utf-8') as f:
+            return self.merge_batch(csv.DictReader(f))
+
+    def close(self):
+        self.master.commit()
+        self.master.close()
+
+
+def parse_rules(keep_old):
+    """--keep-old naziv,grad → {'naziv': KEEP_OLD, 'grad': KEEP_OLD}"""
+    return {field.strip(): KEEP_OLD for field in (keep_old or '').split(',') if field.strip()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Spoji nove rezultate u glavni fajl po PIB-u')
+    parser.add_argument('batches', nargs='+', help='CSV fajlovi sa novim rezultatima')
+    parser.add_argument('--master', default='rezultati.csv', help='Glavni fajl (.csv ili .sqlite)')
+    parser.add_argument('--keep-old', help='Polja u kojima postojeća neprazna vrednost ostaje (npr. naziv,grad)')
+    args = parser.parse_args()
+
+    merger = ResultMerger(args.master, parse_rules(args.keep_old))
+    if merger.duplicates.updated or merger.duplicates.unchanged:
+        print(f"Duplikati u {args.master}: {merger.duplicates.updated + merger.duplicates.unchanged} spojeno")
+    if merger.duplicates.skipped:
+        print(f"⚠ {args.master}: {merger.duplicates.skipped} redova bez PIB-a ostaje nepromenjeno")
+
+    total = MergeStats()
+    try:
+        for path in args.batches:
+            stats = merger.merge_file(path)
+            total += stats
+            print(f"{path}: {stats}")
+    finally:
+        merger.close()
+    print(f"\n✓ Ukupno: {total}")
+
+
+if __name__ == "__main__":
+    main()
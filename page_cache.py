@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Kompresovani keš HTML stranica na disku (ključ je URL)"""
+
+import gzip
+import hashlib
+import os
+import re
+import time
+
+DEFAULT_CACHE_DIR = ".page_cache"
+DEFAULT_TTL_DAYS = 30
+DEFAULT_MAX_MB = 500
+
+# Delovi stranice koji se menjaju i kada se podaci firme ne menjaju
+VOLATILE_RE = re.compile(
+    r'<script\b.*?</script>|<style\b.*?</style>|<!--.*?-->|<input\b[^>]*type="hidden"[^>]*>|\s+',
+    re.DOTALL | re.IGNORECASE,
+)
+
+
+class PageCache:
+    """Keš stranica: jedan gzip fajl po URL-u, TTL, limit veličine i LRU izbacivanje.
+
+    Ime fajla je SHA-256 URL-a. Vreme preuzimanja se čuva kao mtime fajla,
+    a poslednje korišćenje kao atime (postavlja se eksplicitno pri čitanju),
+    pa nije potreban poseban indeks.
+    """
+
+    SUFFIX = ".html.gz"
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, ttl_days=DEFAULT_TTL_DAYS, max_mb=DEFAULT_MAX_MB):
+        self.cache_dir = cache_dir
+        self.ttl = ttl_days * 86400 if ttl_days else None
+        self.max_bytes = int(max_mb * 1024 * 1024) if max_mb else None
+        self.hits = 0
+        self.misses = 0
+        self._size = None  # ukupna veličina keša, računa se pri prvom upisu
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, key[:2], key + self.SUFFIX)
+
+    def entry_path(self, url):
+        """Putanja unosa za URL ako postoji u kešu, inače None"""
+        path = self._path(url)
+        return path if os.path.exists(path) else None
+
+    def get(self, url):
+        """Vrati HTML iz keša ili None ako ga nema ili je istekao"""
+        entry = self.get_dated(url)
+        return entry[0] if entry else None
+
+    def get_dated(self, url):
+        """Kao get, ali vraća (HTML, vreme preuzimanja sa sajta) ili None"""
+        path = self._path(url)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+
+        now = time.time()
+        if self.ttl and now - st.st_mtime > self.ttl:
+            self._remove(path)
+            self.misses += 1
+            return None
+
+        try:
+            stored_url, html = read_entry(path)
+        except (OSError, EOFError, ValueError):
+            self._remove(path)
+            self.misses += 1
+            return None
+
+        if stored_url != url:
+            self.misses += 1
+            return None
+
+        # LRU: osveži samo atime, mtime ostaje vreme preuzimanja
+        try:
+            os.utime(path, (now, st.st_mtime))
+        except OSError:
+            pass
+        self.hits += 1
+        return html, st.st_mtime
+
+    def put(self, url, html):
+        """Sačuvaj HTML u keš (atomski upis) i po potrebi izbaci najstarije unose"""
+        path = self._path(url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with gzip.open(tmp_path, 'wb', compresslevel=6) as f:
+                f.write(url.encode('utf-8') + b"\n")
+                f.write(html.encode('utf-8'))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"  ⚠ Greška pri upisu u keš: {e}")
+            self._remove(tmp_path)
+            return
+
+        if self.max_bytes:
+            if self._size is None:
+                self._size = sum(os.path.getsize(p) for p in self.entries())
+            else:
+                self._size += os.path.getsize(path)
+            if self._size > self.max_bytes:
+                self.evict()
+
+    def entries(self):
+        """Iterator kroz putanje svih unosa u kešu"""
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(self.SUFFIX):
+                    yield os.path.join(root, name)
+
+    def evict(self):
+        """Briše istekle unose, pa najmanje skoro korišćene dok keš ne padne na 90% limita"""
+        now = time.time()
+        live = []
+        total = 0
+        for path in self.entries():
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            if self.ttl and now - st.st_mtime > self.ttl:
+                self._remove(path)
+                continue
+            live.append((st.st_atime, st.st_size, path))
+            total += st.st_size
+
+        removed = 0
+        if self.max_bytes and total > self.max_bytes:
+            target = self.max_bytes * 0.9
+            live.sort()
+            for _, size, path in live:
+                if total <= target:
+                    break
+                self._remove(path)
+                total -= size
+                removed += 1
+        self._size = total
+        return removed
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def read_entry(path):
+    """Pročitaj unos iz keša: vraća (url, html)"""
+    with gzip.open(path, 'rb') as f:
+        payload = f.read()
+    url, sep, html = payload.partition(b"\n")
+    if not sep:
+        raise ValueError(f"Neispravan unos u kešu: {path}")
+    return url.decode('utf-8'), html.decode('utf-8')
+
+
+def content_hash(html):
+    """SHA-256 sadržaja stranice bez skripti, stilova, komentara, skrivenih polja i razmaka"""
+    return hashlib.sha256(VOLATILE_RE.sub('', html).encode('utf-8')).hexdigest()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Crnogorski brojevi telefona: pronalaženje u tekstu, provera i kanonski oblik
+
+Jedan kompajliran regex nalazi kandidate u jednom prolazu kroz tekst, a
+prefiks (2 cifre posle 0 / +382) se proverava lookup-om u skupu poznatih
+mobilnih i fiksnih prefiksa. Svaki broj ima E.164 oblik (+38267123456) i
+lokalni oblik (067123456) koji ide u kolonu telefon. Formatter koristi
+vektorizovanu varijantu nad pandas Series.
+"""
+
+import re
+from collections import namedtuple
+
+COUNTRY_CODE = '382'
+MOBILE_PREFIXES = frozenset({'60', '63', '66', '67', '68', '69'})
+LANDLINE_PREFIXES = frozenset({'20', '30', '31', '32', '33', '40', '41', '50', '51', '52'})
+OTHER_PREFIXES = frozenset({'77', '78', '80'})  # VoIP i besplatni brojevi
+PHONE_KINDS = {
+    **{prefix: 'mobilni' for prefix in MOBILE_PREFIXES},
+    **{prefix: 'fiksni' for prefix in LANDLINE_PREFIXES},
+    **{prefix: 'ostalo' for prefix in OTHER_PREFIXES},
+}
+
+_SEP = r'[\s\-./]*'
+
+# U tekstu broj mora imati +382 / 00382 ili vodeću nulu, da se ne uhvati PIB ili iznos
+PHONE_SCAN_RE = re.compile(
+    r'(?<![\w+])'
+    rf'(?:(?:\+|00)\s?{COUNTRY_CODE}{_SEP}(?:\(0\){_SEP})?|\(?0)'
+    rf'(\d{{2}})\)?{_SEP}'
+    r'(\d(?:[\s\-./]?\d){5})'
+    r'(?!\d)'
+)
+_DIGITS_RE = re.compile(r'\D')
+
+# Jedna vrednost (tel: link, ćelija iz CSV-a): dozvoljen i broj bez vodeće nule
+_VALUE_CLEAN_RE = r'\.0$|[\s\-./()]'
+PHONE_VALUE_RE = re.compile(rf'^(?:(?:\+|00)?{COUNTRY_CODE}0?|0)?(\d{{8}})$')
+
+
+class PhoneNumber(namedtuple('PhoneNumber', 'national kind')):
+    """Broj bez pozivnog broja zemlje i vodeće nule (8 cifara) i vrsta broja"""
+
+    __slots__ = ()
+
+    @property
+    def e164(self):
+        return f"+{COUNTRY_CODE}{self.national}"
+
+    @property
+    def local(self):
+        return f"0{self.national}"
+
+    @property
+    def display(self):
+        return f"0{self.national[:2]} {self.national[2:5]} {self.national[5:]}"
+
+
+def _make(national):
+    kind = PHONE_KINDS.get(national[:2])
+    return PhoneNumber(national, kind) if kind else None
+
+
+def find_phones(text):
+    """Svi ispravni brojevi u tekstu, redom pojavljivanja (jedan prolaz)"""
+    if not text:
+        return
+    for match in PHONE_SCAN_RE.finditer(text):
+        number = _make(match.group(1) + _DIGITS_RE.sub('', match.group(2)))
+        if number:
+            yield number
+
+
+def first_phone(text):
+    """Prvi ispravan broj u tekstu ili None"""
+    return next(find_phones(text), None)
+
+
+def parse_phone(value):
+    """Jedna vrednost ('+382 67 123 456', '067/123-456', '67123456.0') → PhoneNumber ili None"""
+    if value is None:
+        return None
+    match = PHONE_VALUE_RE.match(re.sub(_VALUE_CLEAN_RE, '', str(value).strip()))
+    return _make(match.group(1)) if match else None
+
+
+def normalize_phone_series(series):
+    """Vektorizovano za pandas: DataFrame sa kolonama local, e164 i kind.
+
+    Neispravne i prazne vrednosti daju NaN u sve tri kolone.
+    """
+    national = series.str.replace(_VALUE_CLEAN_RE, '', regex=True).str.extract(PHONE_VALUE_RE, expand=False)
+    kind = national.str[:2].map(PHONE_KINDS)
+    national = national.where(kind.notna())
+    return national.to_frame('national').assign(
+        local='0' + national,
+        e164=f'+{COUNTRY_CODE}' + national,
+        kind=kind,
+    )[['local', 'e164', 'kind']]
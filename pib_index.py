@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Trajni SQLite indeks PIB → URL profila na companywall.me
+
+Uz URL se čuva i kada je profil poslednji put preuzet i heš njegovog
+sadržaja, za režim osvežavanja (--refresh-older-than).
+"""
+
+import sqlite3
+import time
+
+DEFAULT_INDEX_DB = "pib_index.sqlite"
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _timestamp(seconds=None):
+    return time.strftime(TIMESTAMP_FORMAT, time.localtime(seconds))
+
+
+class PibIndex:
+    """Mapa PIB → /firma/ URL, da se za poznate PIB-ove preskoči pretraga"""
+
+    def __init__(self, db_path=DEFAULT_INDEX_DB):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS pib_urls ("
+            " pib TEXT PRIMARY KEY,"
+            " url TEXT NOT NULL,"
+            " updated_at TEXT NOT NULL)"
+        )
+        # Kolone za osvežavanje (stari indeksi ih dobijaju ovde)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(pib_urls)")}
+        for column in ('fetched_at', 'content_hash'):
+            if column not in columns:
+                self.conn.execute(f"ALTER TABLE pib_urls ADD COLUMN {column} TEXT")
+        self.conn.commit()
+
+    def get(self, pib):
+        """Vrati poznati URL profila ili None"""
+        row = self.conn.execute("SELECT url FROM pib_urls WHERE pib = ?", (pib,)).fetchone()
+        return row[0] if row else None
+
+    def put(self, pib, url):
+        """Upiši ili osveži URL profila za PIB (nov URL briše heš starog sadržaja)"""
+        self.conn.execute(
+            "INSERT INTO pib_urls (pib, url, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(pib) DO UPDATE SET url = excluded.url, updated_at = excluded.updated_at,"
+            " content_hash = CASE WHEN url = excluded.url THEN content_hash END",
+            (pib, url, _timestamp()),
+        )
+        self.conn.commit()
+
+    def content_hash(self, pib):
+        """Heš sadržaja profila pri poslednjem preuzimanju ili None"""
+        row = self.conn.execute("SELECT content_hash FROM pib_urls WHERE pib = ?", (pib,)).fetchone()
+        return row[0] if row else None
+
+    def mark_fetched(self, pib, content_hash, fetched_at=None):
+        """Zabeleži da je profil obrađen; fetched_at je vreme preuzimanja sa sajta (podrazumevano sada)"""
+        self.conn.execute(
+            "UPDATE pib_urls SET fetched_at = ?, content_hash = ? WHERE pib = ?",
+            (_timestamp(fetched_at), content_hash, pib),
+        )
+        self.conn.commit()
+
+    def fresh_pibs(self, max_age_days):
+        """PIB-ovi preuzeti pre manje od max_age_days dana"""
+        cutoff = _timestamp(time.time() - max_age_days * 86400)
+        rows = self.conn.execute("SELECT pib FROM pib_urls WHERE fetched_at >= ?", (cutoff,))
+        return {row[0] for row in rows}
+
+    def remove(self, pib):
+        """Obriši PIB iz indeksa (npr. kada profil više ne postoji)"""
+        self.conn.execute("DELETE FROM pib_urls WHERE pib = ?", (pib,))
+        self.conn.commit()
+
+    def items(self):
+        """Svi parovi (pib, url) iz indeksa"""
+        return self.conn.execute("SELECT pib, url FROM pib_urls").fetchall()
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM pib_urls").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
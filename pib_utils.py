@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Pomoćne funkcije za PIB (poreski identifikacioni broj)"""
+
+
+def normalize_pib(pib):
+    """PIB kao string od 8 cifara (bez '.0' i sa vodećim nulama)"""
+    pib_str = str(pib).strip()
+    if pib_str.endswith('.0'):
+        pib_str = pib_str[:-2]
+    return pib_str.zfill(8) if pib_str.isdigit() else pib_str
+
+
+PIB_LENGTH = 8
+PIB_WEIGHTS = (8, 7, 6, 5, 4, 3, 2)
+EXCEL_SUFFIXES = ('.xlsx', '.xlsm', '.xls')
+
+
+def pib_check_digit(pib):
+    """Kontrolna cifra crnogorskog PIB-a (moduo 11, težine 8..2 na prvih 7 cifara)"""
+    total = sum(int(digit) * weight for digit, weight in zip(pib[:7], PIB_WEIGHTS))
+    return (11 - total % 11) % 11 % 10
+
+
+def validate_pib(pib, check_digit=True):
+    """Razlog odbijanja normalizovanog PIB-a ili None ako je ispravan"""
+    if not pib.isdigit():
+        return "nije broj"
+    if len(pib) != PIB_LENGTH:
+        return f"ima {len(pib)} cifara"
+    if check_digit and int(pib[-1]) != pib_check_digit(pib):
+        return "pogrešna kontrolna cifra"
+    return None
+
+
+class InputReport:
+    """Šta je urađeno sa ulaznim redovima"""
+
+    def __init__(self):
+        self.total = 0
+        self.accepted = 0
+        self.duplicates = 0
+        self.already_done = 0
+        self.rejected = []  # (broj reda, sirova vrednost, razlog)
+
+    def print(self, limit=20):
+        print(f"Učitano {self.total} redova: {self.accepted} PIBova za obradu, "
+              f"{self.duplicates} duplikata, {self.already_done} već završeno, {len(self.rejected)} odbijeno")
+        for line_no, raw, reason in self.rejected[:limit]:
+            print(f"  ✗ red {line_no}: '{raw}' - {reason}")
+        if len(self.rejected) > limit:
+            print(f"  ... i još {len(self.rejected) - limit} odbijenih")
+
+
+def _pib_column(header):
+    for i, name in enumerate(header):
+        if name.strip().lower() == 'pib':
+            return i
+    return None
+
+
+def iter_input_values(path):
+    """Sirove PIB vrednosti iz ulaza kao (broj reda, vrednost), čita se red po red.
+
+    Tekstualni fajl: jedan PIB po redu. CSV/Excel: kolona 'pib' ako postoji,
+    inače prva kolona.
+    """
+    lower = path.lower()
+    if lower.endswith(EXCEL_SUFFIXES):
+        import pandas as pd
+        try:
+            df = pd.read_excel(path, dtype=str)
+        except ImportError:
+            engine = 'xlrd' if lower.endswith('.xls') else 'openpyxl'
+            raise RuntimeError(f"Excel ulaz {path} zahteva {engine} (pip install {engine})")
+        column = next((col for col in df.columns if str(col).strip().lower() == 'pib'), df.columns[0])
+        for i, value in enumerate(df[column], 2):
+            if isinstance(value, str):
+                yield i, value
+        return
+
+    with open(path, 'r', newline='', encoding='utf-8-sig') as f:
+        if lower.endswith('.csv'):
+            import csv
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                return
+            column = _pib_column(header)
+            if column is None:
+                # Nema zaglavlja sa 'pib', prvi red je podatak
+                column = 0
+                yield 1, header[0] if header else ''
+            for line_no, row in enumerate(reader, 2):
+                if len(row) > column:
+                    yield line_no, row[column]
+        else:
+            for line_no, line in enumerate(f, 1):
+                yield line_no, line
+
+
+def load_pibs(path, exclude=None, check_digit=True):
+    """Normalizovani, provereni PIB-ovi bez duplikata; vraća (pibs, InputReport)"""
+    exclude = exclude or set()
+    report = InputReport()
+    seen = set()
+    pibs = []
+    for line_no, raw in iter_input_values(path):
+        raw = raw.strip()
+        if not raw:
+            continue
+        report.total += 1
+        pib = normalize_pib(raw.replace(' ', ''))
+        reason = validate_pib(pib, check_digit)
+        if reason:
+            report.rejected.append((line_no, raw, reason))
+            continue
+        if pib in seen:
+            report.duplicates += 1
+            continue
+        seen.add(pib)
+        if pib in exclude:
+            report.already_done += 1
+            continue
+        pibs.append(pib)
+    report.accepted = len(pibs)
+    return pibs, report
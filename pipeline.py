@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Faze obrade jednog PIB-a posle učitavanja profila: parsiranje i upis
+
+InlineStages radi sve odmah u niti koja učitava stranice (dosadašnje
+ponašanje). PipelinedStages predaje HTML kroz ograničene redove: pool niti
+parsira, a jedna nit upisuje u sink, journal i metrike, pa browser za to
+vreme već učitava sledeći profil. Broj zahteva prema sajtu se ne menja.
+"""
+
+import queue
+import threading
+
+from extractor import parse_profile_html
+
+DEFAULT_PARSE_WORKERS = 2
+DEFAULT_QUEUE_SIZE = 8
+_DONE = object()
+
+
+class PageJob:
+    """Jedan PIB na putu kroz faze"""
+
+    __slots__ = ('pib', 'timings', 'profile_url', 'from_index', 'html', 'content_hash', 'fetched_at', 'data', 'status', 'reason')
+
+    def __init__(self, pib, timings):
+        self.pib = pib
+        self.timings = timings
+        self.profile_url = None
+        self.from_index = False
+        self.html = None
+        self.content_hash = None
+        self.fetched_at = None  # vreme preuzimanja sa sajta (za stranicu iz keša vreme upisa u keš)
+        self.data = None
+        self.status = None
+        self.reason = None
+
+
+class InlineStages:
+    """Parsiranje i upis odmah, u niti pozivaoca"""
+
+    def __init__(self, sink, metrics, on_success, on_failure, verbose=True):
+        self.sink = sink
+        self.metrics = metrics
+        self.on_success = on_success
+        self.on_failure = on_failure
+        self.verbose = verbose
+        self.success_count = 0
+        self.unchanged_count = 0
+        self.processed = 0
+        # Izmene PIB indeksa; primenjuje ih nit koja je otvorila SQLite konekciju
+        self.index_updates = queue.SimpleQueue()
+        # Hash upisanog profila ide u indeks tek kada je serija sa tim redom upisana
+        self.pending_hashes = {}  # pib → (hash, vreme preuzimanja)
+
+    def start(self):
+        return self
+
+    def submit(self, job):
+        """Profil je učitan (job.html, None ako učitavanje nije uspelo)"""
+        self._parse(job)
+        self._write(job)
+
+    def fail(self, job, status, reason):
+        """PIB je završen bez profila (npr. nije pronađen u pretrazi)"""
+        job.status, job.reason = status, reason
+        self._write(job)
+
+    def skip(self, job, status="unchanged"):
+        """Profil je preuzet, ali se nije promenio: bez parsiranja i upisa rezultata"""
+        job.status = status
+        self._write(job)
+
+    def close(self):
+        """Upiši ostatak bafera sink-a, da i poslednji hash-evi stignu u indeks"""
+        self._flushed(self.sink.flush())
+
+    def _flushed(self, pibs):
+        for pib in pibs:
+            pending = self.pending_hashes.pop(pib, None)
+            if pending:
+                self.index_updates.put((pib,) + pending)
+
+    def apply_index_updates(self, pib_index):
+        """Upiši u indeks sve što su faze prijavile (poziva nit vlasnik indeksa)"""
+        while not self.index_updates.empty():
+            pib, content_hash, fetched_at = self.index_updates.get()
+            if pib_index is None:
+                continue
+            if content_hash is None:
+                pib_index.remove(pib)
+            else:
+                pib_index.mark_fetched(pib, content_hash, fetched_at)
+
+    def _say(self, job, text):
+        # Iz više niti redovi se mešaju, pa svaki nosi PIB
+        print(f"  {text}" if self.verbose else f"  [{job.pib}] {text}")
+
+    def _parse(self, job):
+        if job.html is not None:
+            with job.timings.phase('parse'):
+                job.data = parse_profile_html(job.html, verbose=self.verbose, timings=job.timings)
+        job.html = None  # HTML ne treba držati u redu za upis
+        if not job.data:
+            self._say(job, "✗ Greška pri ekstraktovanju")
+            job.status, job.reason = "extract_failed", "greška pri ekstraktovanju"
+            if job.from_index:
+                # Link iz indeksa možda više ne važi, sledeći put ide pretraga
+                self.index_updates.put((job.pib, None, None))
+
+    def _write(self, job):
+        self.processed += 1
+        if job.status == "unchanged":
+            self.on_success(job.pib)
+            self.metrics.finish(job.timings, job.status)
+            self.unchanged_count += 1
+            self._say(job, f"= Bez promena ({self.unchanged_count} nepromenjenih)")
+            return
+        data = job.data
+        if not data:
+            self.on_failure(job.pib, job.reason)
+            self.metrics.finish(job.timings, job.status)
+            return
+
+        if self.verbose:
+            # Prikaži podatke
+            if data.get('naziv'):
+                print(f"  → Naziv: {data['naziv']}")
+            if data.get('email'):
+                print(f"  → Email: {data['email']}")
+            if data.get('telefon'):
+                print(f"  → Telefon: {data['telefon']}")
+            if data.get('kd'):
+                print(f"  → KD: {data['kd']} {data.get('kd_opis', '')}")
+
+        # Sačuvaj
+        try:
+            with job.timings.phase('save'):
+                if job.content_hash:
+                    self.pending_hashes[job.pib] = (job.content_hash, job.fetched_at)
+                flushed = self.sink.write(job.pib, data)
+                self.on_success(job.pib)
+        except Exception as e:
+            self._say(job, f"✗ Greška pri čuvanju: {e}")
+            self.pending_hashes.pop(job.pib, None)
+            self.metrics.finish(job.timings, "save_failed")
+            return
+        self._flushed(flushed)
+        self.metrics.finish(job.timings, "ok")
+        self.success_count += 1
+        name = '' if self.verbose else f" {data.get('naziv', '')}"
+        self._say(job, f"✓ Sačuvano{name} ({self.success_count}/{self.processed})")
+
+
+class PipelinedStages(InlineStages):
+    """Parsiranje u pool-u niti i upis u posebnoj niti, kroz ograničene redove.
+
+    Pun red blokira predaju, pa browser ne može da odmakne više od
+    queue_size stranica ispred parsiranja i upisa.
+    """
+
+    def __init__(self, sink, metrics, on_success, on_failure,
+                 parse_workers=DEFAULT_PARSE_WORKERS, queue_size=DEFAULT_QUEUE_SIZE):
+        super().__init__(sink, metrics, on_success, on_failure, verbose=False)
+        self.parse_queue = queue.Queue(maxsize=queue_size)
+        self.write_queue = queue.Queue(maxsize=queue_size)
+        self.parsers = [threading.Thread(target=self._parse_loop, name=f"parse-{i}", daemon=True)
+                        for i in range(max(1, parse_workers))]
+        self.writer = threading.Thread(target=self._write_loop, name="writer", daemon=True)
+        self._started = False
+
+    def start(self):
+        for thread in self.parsers:
+            thread.start()
+        self.writer.start()
+        self._started = True
+        return self
+
+    def submit(self, job):
+        self.parse_queue.put(job)
+
+    def fail(self, job, status, reason):
+        job.status, job.reason = status, reason
+        self.write_queue.put(job)
+
+    def skip(self, job, status="unchanged"):
+        job.status = status
+        self.write_queue.put(job)
+
+    def close(self):
+        """Sačekaj da se obradi sve što je predato, pa zaustavi niti"""
+        if not self._started:
+            return
+        for _ in self.parsers:
+            self.parse_queue.put(_DONE)
+        for thread in self.parsers:
+            thread.join()
+        self.write_queue.put(_DONE)
+        self.writer.join()
+        self._started = False
+        super().close()
+
+    def _parse_loop(self):
+        while True:
+            job = self.parse_queue.get()
+            if job is _DONE:
+                return
+            try:
+                self._parse(job)
+            except Exception as e:
+                self._say(job, f"✗ Greška pri parsiranju: {e}")
+                job.data = None
+                job.status, job.reason = "extract_failed", "greška pri ekstraktovanju"
+            self.write_queue.put(job)
+
+    def _write_loop(self):
+        while True:
+            job = self.write_queue.get()
+            if job is _DONE:
+                return
+            try:
+                self._write(job)
+            except Exception as e:
+                self._say(job, f"✗ Greška pri upisu: {e}")
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Token bucket limiter za tempo zahteva prema sajtu"""
+
+import threading
+import time
+
+DEFAULT_REQUESTS_PER_MINUTE = 20
+DEFAULT_BURST = 2
+
+
+class RateLimiter:
+    """Token bucket: najviše `burst` zahteva odjednom, prosečno `per_minute` u minuti"""
+
+    def __init__(self, per_minute=DEFAULT_REQUESTS_PER_MINUTE, burst=DEFAULT_BURST):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.waited = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Sačekaj dok ne bude slobodan token, pa ga potroši"""
+        if self.rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < 1:
+                delay = (1 - self.tokens) / self.rate
+                time.sleep(delay)
+                self.waited += delay
+                self.tokens = 1.0
+                self.updated = time.monotonic()
+            self.tokens -= 1
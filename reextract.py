@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Offline ponovna ekstrakcija iz sačuvanog HTML-a, paralelno kroz više procesa"""
+
+import gzip
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from extractor import parse_profile_html
+from kd_codes import set_kd_table
+from page_cache import read_entry
+
+HTML_SUFFIXES = ('.html.gz', '.html', '.htm')
+
+
+def find_html_jobs(html_dir):
+    """Poslovi iz foldera sačuvanih profila; ime fajla je PIB (npr. 02825767.html)"""
+    jobs = []
+    for name in sorted(os.listdir(html_dir)):
+        for suffix in HTML_SUFFIXES:
+            if name.endswith(suffix):
+                jobs.append((name[:-len(suffix)], os.path.join(html_dir, name), False))
+                break
+    return jobs
+
+
+def find_cache_jobs(cache, pib_index):
+    """Poslovi iz keša stranica: PIB → URL iz indeksa, URL → fajl u kešu"""
+    jobs = []
+    for pib, url in pib_index.items():
+        path = cache.entry_path(url)
+        if path:
+            jobs.append((pib, path, True))
+    return jobs
+
+
+def read_html_file(path):
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8', errors='replace') as f:
+        return f.read()
+
+
+def _reextract_job(job):
+    """Radi u procesu iz pool-a: učitaj HTML i parsiraj ga"""
+    pib, path, from_cache = job
+    try:
+        html = read_entry(path)[1] if from_cache else read_html_file(path)
+        return pib, parse_profile_html(html, verbose=False)
+    except Exception:
+        return pib, None
+
+
+def reextract_all(jobs, sink, workers=None, kd_table_path=None):
+    """Parsira sve poslove kroz ProcessPoolExecutor i upisuje rezultate u sink"""
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs)))
+    chunksize = max(1, len(jobs) // (workers * 8))
+    start = time.perf_counter()
+    success_count = 0
+    failed = []
+
+    print(f"Ponovna ekstrakcija: {len(jobs)} profila, {workers} procesa")
+    # Procesi ne nasleđuju izbor šifarnika (spawn na Windows-u), pa ga dobijaju kroz initializer
+    initializer, initargs = (set_kd_table, (kd_table_path,)) if kd_table_path else (None, ())
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as pool:
+        for pib, data in pool.map(_reextract_job, jobs, chunksize=chunksize):
+            if data:
+                sink.write(pib, data)
+                success_count += 1
+            else:
+                failed.append(pib)
+    sink.flush()
+
+    elapsed = time.perf_counter() - start
+    rate = len(jobs) / elapsed if elapsed > 0 else 0
+    print(f"✓ Ekstraktovano {success_count}/{len(jobs)} za {elapsed:.1f}s ({rate:.0f} profila/s)")
+    if failed:
+        print(f"  ✗ Neuspešno ({len(failed)}): {', '.join(failed[:20])}{' ...' if len(failed) > 20 else ''}")
+    return success_count, failed
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Izvoz formatiranih rezultata za dalju obradu: Parquet i SQLite
+
+Obe varijante koriste istu eksplicitnu šemu (PIB, telefon i KD ostaju
+tekst sa vodećim nulama, prihod je float64, broj zaposlenih int32), pa
+čitalac ne mora da pogađa tipove. SQLite ima indekse na pib, kd i grad,
+a Parquet se čita samo po potrebnim kolonama. Sa append=True izvoz se
+dopunjuje umesto da se piše iznova.
+"""
+
+import glob
+import os
+import sqlite3
+
+import pandas as pd
+
+from result_sink import RESULT_COLUMNS
+
+NUMERIC_COLUMNS = {'prihod': 'float64', 'broj_zaposlenih': 'int32'}
+EXPORT_SCHEMA = [(col, NUMERIC_COLUMNS.get(col, 'string')) for col in RESULT_COLUMNS]
+SQLITE_TYPES = {'string': 'TEXT', 'float64': 'REAL', 'int32': 'INTEGER'}
+INDEXED_COLUMNS = ('kd', 'grad')  # pib je primarni ključ, već ima indeks
+PARQUET_PART = "part-{:05d}.parquet"
+
+
+def typed_frame(df):
+    """DataFrame sa kolonama i tipovima iz EXPORT_SCHEMA; kolone van šeme se ne izvoze"""
+    out = pd.DataFrame(index=df.index)
+    for col, kind in EXPORT_SCHEMA:
+        values = df[col] if col in df.columns else pd.Series(pd.NA, index=df.index, dtype=object)
+        if kind == 'string':
+            out[col] = values.astype('string')
+        else:
+            values = pd.to_numeric(values, errors='coerce')
+            out[col] = values.astype('float64') if kind == 'float64' else values.round().astype('Int32')
+    return out
+
+
+class ResultExport:
+    """Zajednički interfejs: write(df) za svaki (formatirani) deo, close() na kraju"""
+
+    def __init__(self, path, append=False):
+        self.path = path
+        self.append = append
+        self.written = 0
+
+    def write(self, df):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SqliteExport(ResultExport):
+    """Tabela rezultati sa tipiziranim kolonama; append radi upsert po PIB-u"""
+
+    TABLE = 'rezultati'
+
+    def __init__(self, path, append=False):
+        super().__init__(path, append)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        with self.conn:
+            if not append:
+                self.conn.execute(f"DROP TABLE IF EXISTS {self.TABLE}")
+            cols = ", ".join(f"{col} {SQLITE_TYPES[kind]}" for col, kind in EXPORT_SCHEMA if col != 'pib')
+            self.conn.execute(f"CREATE TABLE IF NOT EXISTS {self.TABLE} (pib TEXT PRIMARY KEY, {cols})")
+            # Tabela iz starije verzije dobija nove kolone
+            existing = {row[1] for row in self.conn.execute(f"PRAGMA table_info({self.TABLE})")}
+            for col, kind in EXPORT_SCHEMA:
+                if col not in existing:
+                    self.conn.execute(f"ALTER TABLE {self.TABLE} ADD COLUMN {col} {SQLITE_TYPES[kind]}")
+            for col in INDEXED_COLUMNS:
+                self.conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{self.TABLE}_{col} ON {self.TABLE} ({col})")
+
+    def write(self, df):
+        typed = typed_frame(df)
+        typed = typed[typed['pib'].notna()]
+        rows = typed.astype(object).where(typed.notna(), None).itertuples(index=False, name=None)
+        columns = [col for col, _ in EXPORT_SCHEMA]
+        placeholders = ", ".join("?" for _ in columns)
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO {self.TABLE} ({', '.join(columns)}) VALUES ({placeholders})",
+                rows,
+            )
+        self.written += len(typed)
+
+    def close(self):
+        self.conn.close()
+
+
+class ParquetExport(ResultExport):
+    """Folder sa Parquet delovima (part-00000.parquet, ...), čita se kao jedna tabela.
+
+    Svaki write() je novi deo. Sa append=True upisuju se samo PIB-ovi kojih
+    još nema; izmenjeni postojeći redovi traže pun izvoz.
+    """
+
+    def __init__(self, path, append=False):
+        super().__init__(path, append)
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet izvoz zahteva pyarrow (pip install pyarrow)")
+        self._pa, self._pq = pa, pq
+        self.schema = pa.schema([(col, getattr(pa, kind)()) for col, kind in EXPORT_SCHEMA])
+        os.makedirs(path, exist_ok=True)
+        parts = sorted(glob.glob(os.path.join(path, PARQUET_PART.replace('{:05d}', '*'))))
+        self.known = set()
+        if append and parts:
+            # Samo kolona pib, ne ceo izvoz
+            self.known = set(pq.read_table(parts, columns=['pib']).column('pib').to_pylist())
+        elif not append:
+            for part in parts:
+                os.remove(part)
+            parts = []
+        self.next_part = len(parts)
+
+    def write(self, df):
+        typed = typed_frame(df)
+        typed = typed[typed['pib'].notna() & ~typed['pib'].isin(self.known)]
+        if typed.empty:
+            return
+        table = self._pa.Table.from_pandas(typed, schema=self.schema, preserve_index=False)
+        part = os.path.join(self.path, PARQUET_PART.format(self.next_part))
+        # Privremeni fajl počinje tačkom, pa ga čitaoci preskaču dok se ne preimenuje
+        tmp = os.path.join(self.path, '.' + os.path.basename(part) + '.tmp')
+        self._pq.write_table(table, tmp, compression='snappy')
+        os.replace(tmp, part)
+        self.next_part += 1
+        self.known.update(typed['pib'])
+        self.written += len(typed)
+
+
+def open_exports(sqlite_path=None, parquet_path=None, append=False):
+    """Izvozi zadati u komandnoj liniji (prazna lista ako nijedan nije)"""
+    exports = []
+    if sqlite_path:
+        exports.append(SqliteExport(sqlite_path, append))
+    if parquet_path:
+        exports.append(ParquetExport(parquet_path, append))
+    return exports
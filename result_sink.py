@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Izlaz rezultata sa baferovanim upisom: CSV ili SQLite backend"""
+
+import csv
+import io
+import os
+import sqlite3
+import time
+
+from fileio import write_atomic
+
+RESULT_COLUMNS = ['pib', 'naziv', 'email', 'telefon', 'telefon_e164', 'telefon_tip', 'kd', 'kd_opis', 'prihod',
+                  'broj_zaposlenih', 'grad']
+
+DEFAULT_BATCH_SIZE = 25
+DEFAULT_FLUSH_INTERVAL = 30
+
+
+class ResultSink:
+    """Zajednička logika: redovi se skupljaju u bafer i upisuju u serijama.
+
+    Serija se upisuje kada bafer dostigne batch_size redova ili kada od
+    poslednjeg upisa prođe flush_interval sekundi. Sa fsync=True svaka
+    serija se i fizički upisuje na disk pre nego što write() vrati.
+    """
+
+    def __init__(self, path, batch_size=DEFAULT_BATCH_SIZE, flush_interval=DEFAULT_FLUSH_INTERVAL, fsync=False):
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.columns = list(RESULT_COLUMNS)
+        self.written = 0
+        self._buffer = []
+        self._last_flush = time.monotonic()
+
+    def write(self, pib, data):
+        """Dodaj rezultat za PIB u bafer; vraća PIB-ove serije ako je upravo upisana"""
+        row = [pib if col == 'pib' else data.get(col, '') or '' for col in self.columns]
+        self._buffer.append(row)
+        if len(self._buffer) >= self.batch_size or (
+            self.flush_interval and time.monotonic() - self._last_flush >= self.flush_interval
+        ):
+            return self.flush()
+        return []
+
+    def flush(self):
+        """Upiši sve baferovane redove kao jednu seriju; vraća njihove PIB-ove"""
+        flushed = []
+        if self._buffer:
+            self._write_rows(self._buffer)
+            pib_col = self.columns.index('pib')
+            flushed = [row[pib_col] for row in self._buffer]
+            self.written += len(self._buffer)
+            self._buffer = []
+        self._last_flush = time.monotonic()
+        return flushed
+
+    def completed_pibs(self):
+        """PIB-ovi koji su već upisani (sirove vrednosti iz izlaza)"""
+        raise NotImplementedError
+
+    def _write_rows(self, rows):
+        raise NotImplementedError
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class CsvSink(ResultSink):
+    """CSV backend: fajl ostaje otvoren, serija se upisuje jednim write() pozivom"""
+
+    def __init__(self, path, **kwargs):
+        super().__init__(path, **kwargs)
+        self._repair_tail()
+        header = self._read_header()
+        if header:
+            # Postojeći fajl zadržava svoj redosled kolona, nove kolone idu na kraj
+            missing = [col for col in RESULT_COLUMNS if col not in header]
+            if missing:
+                header = self._add_columns(header, missing)
+            self.columns = header
+        self._file = open(path, 'a', newline='', encoding='utf-8')
+        if not header:
+            self._file.write(self._format_rows([self.columns]))
+            self._sync()
+
+    def _repair_tail(self):
+        """Odseci poslednji nepotpuni red ako je prethodni upis prekinut"""
+        if not os.path.isfile(self.path):
+            return
+        with open(self.path, 'rb+') as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return
+            # Traži poslednji kraj reda unazad, u blokovima
+            pos = size
+            while pos > 0:
+                step = min(4096, pos)
+                pos -= step
+                f.seek(pos)
+                chunk = f.read(step)
+                idx = chunk.rfind(b"\n")
+                if idx != -1:
+                    f.truncate(pos + idx + 1)
+                    print(f"  ⚠ Uklonjen nepotpun poslednji red iz {self.path}")
+                    return
+            f.truncate(0)
+
+    def _add_columns(self, header, missing):
+        """Jednokratno dopiši nove kolone (prazne) u postojeći fajl"""
+        def write_rows(f):
+            writer = csv.writer(f)
+            writer.writerow(header + missing)
+            with open(self.path, 'r', newline='', encoding='utf-8') as src:
+                reader = csv.reader(src)
+                next(reader, None)
+                for row in reader:
+                    writer.writerow(row + [''] * (len(header) + len(missing) - len(row)))
+
+        write_atomic(self.path, write_rows)
+        print(f"  ⚠ Dodate kolone {', '.join(missing)} u {self.path}")
+        return header + missing
+
+    def _read_header(self):
+        if not os.path.isfile(self.path):
+            return None
+        with open(self.path, 'r', newline='', encoding='utf-8') as f:
+            return next(csv.reader(f), None)
+
+    @staticmethod
+    def _format_rows(rows):
+        buf = io.StringIO()
+        csv.writer(buf).writerows(rows)
+        return buf.getvalue()
+
+    def _sync(self):
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def _write_rows(self, rows):
+        self._file.write(self._format_rows(rows))
+        self._sync()
+
+    def completed_pibs(self):
+        self.flush()
+        with open(self.path, 'r', newline='', encoding='utf-8') as f:
+            return {row['pib'] for row in csv.DictReader(f) if row.get('pib')}
+
+    def close(self):
+        super().close()
+        self._file.close()
+
+
+class SqliteSink(ResultSink):
+    """SQLite backend: WAL režim, jedna transakcija po seriji, PIB je primarni ključ"""
+
+    TABLE = 'rezultati'
+
+    def __init__(self, path, **kwargs):
+        super().__init__(path, **kwargs)
+        # Sa --pipeline sink otvara glavna nit, a upisuje writer nit. Pristup nikad
+        # nije istovremen: glavna nit ga ponovo koristi tek posle join() writer-a.
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(f"PRAGMA synchronous={'FULL' if self.fsync else 'NORMAL'}")
+        cols = ", ".join(f"{col} TEXT" for col in self.columns if col != 'pib')
+        self.conn.execute(f"CREATE TABLE IF NOT EXISTS {self.TABLE} (pib TEXT PRIMARY KEY, {cols})")
+        # Tabela iz starije verzije dobija nove kolone
+        existing = {row[1] for row in self.conn.execute(f"PRAGMA table_info({self.TABLE})")}
+        for col in self.columns:
+            if col not in existing:
+                self.conn.execute(f"ALTER TABLE {self.TABLE} ADD COLUMN {col} TEXT")
+        self.conn.commit()
+
+    def _write_rows(self, rows):
+        placeholders = ", ".join("?" for _ in self.columns)
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO {self.TABLE} ({', '.join(self.columns)}) VALUES ({placeholders})",
+                rows,
+            )
+
+    def completed_pibs(self):
+        self.flush()
+        return {row[0] for row in self.conn.execute(f"SELECT pib FROM {self.TABLE}")}
+
+    def close(self):
+        super().close()
+        self.conn.close()
+
+
+SINK_BACKENDS = {'csv': CsvSink, 'sqlite': SqliteSink}
+
+
+def sink_backend(path):
+    """Backend po ekstenziji fajla"""
+    return 'sqlite' if path.lower().endswith(('.sqlite', '.sqlite3', '.db')) else 'csv'
+
+
+def open_sink(path, backend=None, **kwargs):
+    """Otvori izlaz; backend se bira po ekstenziji ako nije zadat"""
+    return SINK_BACKENDS[backend or sink_backend(path)](path, **kwargs)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Merenje trajanja faza po PIB-u (JSON-lines) i opcioni profiling režim"""
+
+import json
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+DEFAULT_METRICS_FILE = "metrics.jsonl"
+DEFAULT_PROFILE_FILE = "scraper.pstats"
+
+
+class PibTimings:
+    """Trajanja faza za jedan PIB; ista faza pozvana više puta se sabira"""
+
+    def __init__(self, pib):
+        self.pib = pib
+        self.phases = {}
+        self.started = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+
+class _NullTimings:
+    """Zamena kada se ne meri ništa"""
+
+    pib = None
+    phases = {}
+
+    @contextmanager
+    def phase(self, name):
+        yield
+
+
+NULL_TIMINGS = _NullTimings()
+
+
+class RunMetrics:
+    """Skuplja PibTimings, upisuje ih kao JSON-lines i pravi p50/p95/max pregled"""
+
+    def __init__(self, path=DEFAULT_METRICS_FILE):
+        self.path = path
+        self.samples = defaultdict(list)
+        self._file = open(path, 'a', encoding='utf-8') if path else None
+        self._lock = threading.Lock()
+
+    def start(self, pib):
+        return PibTimings(pib)
+
+    def finish(self, timings, status):
+        """Zaključi merenje za PIB i upiši ga"""
+        total = time.perf_counter() - timings.started
+        record = {
+            "pib": timings.pib,
+            "status": status,
+            "ts": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "total": round(total, 4),
+            "phases": {name: round(value, 4) for name, value in timings.phases.items()},
+        }
+        with self._lock:
+            self.samples["total"].append(total)
+            for name, value in timings.phases.items():
+                self.samples[name].append(value)
+            if self._file:
+                self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+                self._file.flush()
+
+    def print_summary(self):
+        if not self.samples["total"]:
+            return
+        print(f"\n{'Faza':<28}{'n':>6}{'p50':>10}{'p95':>10}{'max':>10}")
+        for name in sorted(self.samples, key=lambda n: (n != "total", n)):
+            values = sorted(self.samples[name])
+            print(f"{name:<28}{len(values):>6}{percentile(values, 50):>10.3f}"
+                  f"{percentile(values, 95):>10.3f}{values[-1]:>10.3f}")
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+
+def percentile(sorted_values, pct):
+    """Percentil (nearest-rank) iz već sortirane liste"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-pct * len(sorted_values) // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def start_profiling():
+    """Uključi cProfile i tracemalloc"""
+    import cProfile
+    import tracemalloc
+    tracemalloc.start(10)
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+
+def stop_profiling(profiler, stats_file=DEFAULT_PROFILE_FILE, top=20):
+    """Zaustavi profiling, sačuvaj cProfile statistiku i ispiši najveće alokacije"""
+    import tracemalloc
+    profiler.disable()
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    import pstats
+    profiler.dump_stats(stats_file)
+    print(f"\ncProfile statistika sačuvana u {stats_file}")
+    pstats.Stats(profiler).sort_stats("cumulative").print_stats(top)
+
+    print(f"Najveće alokacije (tracemalloc, top {top}):")
+    for stat in snapshot.statistics("lineno")[:top]:
+        print(f"  {stat}")
@@ -12,25 +12,54 @@ sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', line_bufferin
 
 import time
 import argparse
-import re
 import os
 import subprocess
 import json
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-try:
-    from webdriver_manager.chrome import ChromeDriverManager
-    from selenium.webdriver.chrome.service import Service
-    USE_WEBDRIVER_MANAGER = True
-except:
-    USE_WEBDRIVER_MANAGER = False
+import csv
+import shutil
+import tempfile
+
+from page_cache import PageCache, DEFAULT_CACHE_DIR, DEFAULT_TTL_DAYS, DEFAULT_MAX_MB, content_hash
+from pib_index import PibIndex, DEFAULT_INDEX_DB
+from merge_results import REPLACE, ResultMerger
+from result_sink import CsvSink, open_sink, sink_backend, RESULT_COLUMNS, SINK_BACKENDS, DEFAULT_BATCH_SIZE, DEFAULT_FLUSH_INTERVAL
+from pib_utils import normalize_pib, load_pibs
+from extractor import parse_profile_html, extract_profile_link
+from kd_codes import set_kd_table
+from pipeline import DEFAULT_PARSE_WORKERS, DEFAULT_QUEUE_SIZE, InlineStages, PageJob, PipelinedStages
+from fetchers import create_fetcher, FETCHER_BACKENDS, DEFAULT_REPLAY_DIR
+from driver_cache import resolve_chromedriver, DEFAULT_DRIVER_CACHE
+from rate_limiter import RateLimiter, DEFAULT_REQUESTS_PER_MINUTE, DEFAULT_BURST
+from run_metrics import RunMetrics, NULL_TIMINGS, DEFAULT_METRICS_FILE, DEFAULT_PROFILE_FILE, start_profiling, stop_profiling
 
 BASE_URL = "https://www.companywall.me/pretraga"
 NORDVPN_PATH = r"C:\Program Files\NordVPN\NordVPN.exe"
 VPN_STATE_FILE = "vpn_state.json"
 
+# Elementi koje zaista čitamo; stranica je spremna kada se pojave
+SEARCH_READY_XPATH = "//a[contains(@href, '/firma/')]"
+PROFILE_READY_XPATH = "//div[contains(concat(' ', normalize-space(@class), ' '), ' qanda-body ')] | //h1"
+DEFAULT_WAIT_TIMEOUT = 8
+
+# Lean režim browsera: resursi koje nikada ne čitamo
+LEAN_CHROME_PREFS = {
+    "profile.managed_default_content_settings.images": 2,
+    "profile.managed_default_content_settings.media_stream": 2,
+    "profile.managed_default_content_settings.notifications": 2,
+    "profile.managed_default_content_settings.geolocation": 2,
+}
+LEAN_BLOCKED_URLS = [
+    # slike, fontovi, mediji
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*.bmp",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.mp3", "*.ogg", "*.wav",
+    # analitika, reklame, društvene mreže
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*googlesyndication.com*", "*googleadservices.com*", "*adservice.google.*",
+    "*facebook.net*", "*facebook.com/tr*", "*hotjar.com*", "*clarity.ms*",
+    "*fonts.googleapis.com*", "*fonts.gstatic.com*",
+]
+
 VPN_SERVERS = [
     "Afghanistan", "Albania", "Algeria", "Andorra", "Angola", "Argentina", "Armenia",
     "Adelaide", "Brisbane", "Melbourne", "Perth", "Sydney", "Austria", "Azerbaijan",
@@ -198,9 +227,79 @@ def force_vpn_change(current_server_index, used_servers, reason="blokada"):
         print(f"❌ Greška pri promeni VPN servera na: {new_server}")
         return current_server_index, VPN_SERVERS[current_server_index]
 
-def create_chrome_driver(headless=True):
-    """Kreira Chrome WebDriver"""
+def load_completed_pibs(sink):
+    """Skup (normalizovanih) PIB-ova koji su već sačuvani u izlazu"""
+    try:
+        return {normalize_pib(pib) for pib in sink.completed_pibs()}
+    except Exception as e:
+        print(f"  ⚠ Greška pri čitanju završenih PIBova: {e}")
+        return set()
+
+def failed_journal_path(output_file):
+    """Dnevnik neuspešnih PIB-ova stoji pored izlaznog fajla"""
+    return f"{output_file}.failed.json"
+
+def load_failed_pibs(journal_file):
+    """Učitava dnevnik neuspešnih PIB-ova: {pib: {"reason", "attempts", "last_failed"}}"""
+    try:
+        if not os.path.exists(journal_file):
+            return {}
+        with open(journal_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"  ⚠ Greška pri učitavanju dnevnika neuspešnih PIBova: {e}")
+        return {}
+
+def save_failed_pibs(journal_file, failed):
+    """Atomski upisuje dnevnik neuspešnih PIB-ova"""
+    try:
+        tmp_file = journal_file + ".tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(failed, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_file, journal_file)
+    except Exception as e:
+        print(f"  ⚠ Greška pri čuvanju dnevnika neuspešnih PIBova: {e}")
+
+def record_failure(journal_file, failed, pib, reason):
+    """Zabeleži neuspeh PIB-a u dnevnik"""
+    entry = failed.get(pib, {"attempts": 0})
+    entry["reason"] = reason
+    entry["attempts"] = entry.get("attempts", 0) + 1
+    entry["last_failed"] = time.strftime("%Y-%m-%d %H:%M:%S")
+    failed[pib] = entry
+    save_failed_pibs(journal_file, failed)
+
+def record_success(journal_file, failed, pib):
+    """Ukloni PIB iz dnevnika neuspešnih nakon uspešnog čuvanja"""
+    if failed.pop(pib, None) is not None:
+        save_failed_pibs(journal_file, failed)
+
+def plan_resume(pibs, completed, failed):
+    """Preostali PIB-ovi iz ulaza bez završenih, i koliko je među njima ranije neuspešnih.
+
+    Neuspešni iz dnevnika se ponavljaju samo ako su u trenutnom ulazu, a ne
+    iz nekog ranijeg rada sa drugom listom.
+    """
+    failed_keys = {normalize_pib(pib) for pib in failed}
+    remaining = []
+    retried = 0
+    seen = set(completed)
+    for pib in pibs:
+        key = normalize_pib(pib)
+        if key not in seen:
+            seen.add(key)
+            remaining.append(pib)
+            retried += key in failed_keys
+    return remaining, retried
+
+def create_chrome_driver(headless=True, lean=False, driver_cache=DEFAULT_DRIVER_CACHE, driver_version=None):
+    """Kreira Chrome WebDriver (lean: bez slika, fontova, medija i third-party skripti)"""
     try:
+        # Selenium se učitava tek kada zaista treba browser
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        from selenium.webdriver.chrome.service import Service
+        
         chrome_options = Options()
         if headless:
             chrome_options.add_argument("--headless")
@@ -212,12 +311,25 @@ def create_chrome_driver(headless=True):
         chrome_options.add_argument("--log-level=3")
         chrome_options.add_experimental_option("excludeSwitches", ["enable-logging"])
         
-        if USE_WEBDRIVER_MANAGER:
-            service = Service(ChromeDriverManager().install())
-            driver = webdriver.Chrome(service=service, options=chrome_options)
+        if lean:
+            # Čitamo samo tekst: ne čekaj slike/stilove i ne preuzimaj ih uopšte
+            chrome_options.page_load_strategy = 'eager'
+            chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+            chrome_options.add_argument("--disable-extensions")
+            chrome_options.add_argument("--mute-audio")
+            chrome_options.add_experimental_option("prefs", LEAN_CHROME_PREFS)
+        
+        driver_path = resolve_chromedriver(driver_cache, driver_version)
+        if driver_path:
+            driver = webdriver.Chrome(service=Service(driver_path), options=chrome_options)
         else:
             driver = webdriver.Chrome(options=chrome_options)
         
+        if lean:
+            # Blokiraj preostale resurse na nivou mreže (CDP)
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": LEAN_BLOCKED_URLS})
+        
         return driver
     except Exception as e:
         print(f"✗ Greška pri pokretanju Chrome: {e}")
@@ -234,181 +346,296 @@ def check_if_blocked(driver):
     except:
         return False
 
-def get_profile_link(driver, pib):
+def fetch_page(fetcher, url, cache=None, limiter=None, ready_xpath=None, timeout=DEFAULT_WAIT_TIMEOUT,
+               timings=NULL_TIMINGS, phase='profile', read_cache=True):
+    """Vrati HTML stranice iz keša ili je učitaj kroz fetcher i sačuvaj u keš (read_cache=False: uvek sa sajta)"""
+    return fetch_page_dated(fetcher, url, cache, limiter, ready_xpath, timeout, timings, phase, read_cache)[0]
+
+def fetch_page_dated(fetcher, url, cache=None, limiter=None, ready_xpath=None, timeout=DEFAULT_WAIT_TIMEOUT,
+                     timings=NULL_TIMINGS, phase='profile', read_cache=True):
+    """Kao fetch_page, ali vraća (HTML, vreme preuzimanja sa sajta); za stranicu iz keša to je vreme upisa u keš"""
+    if cache is not None and read_cache:
+        with timings.phase(f'{phase}.cache'):
+            entry = cache.get_dated(url)
+        if entry is not None:
+            return entry
+    
+    # Tempo zahteva određuje limiter, a ne fiksne pauze
+    if limiter is not None:
+        with timings.phase('rate_wait'):
+            limiter.acquire()
+    result = fetcher.fetch(url, ready_xpath, timeout, timings, phase)
+    fetched_at = time.time()
+    
+    # U keš ide samo gotova stranica: ne blokada (preusmerenje na registraciju)
+    # i ne stranica na kojoj se traženi element nije pojavio do isteka čekanja
+    if cache is not None and result.ready and not result.blocked:
+        with timings.phase(f'{phase}.cache'):
+            cache.put(url, result.html)
+    return result.html, fetched_at
+
+def get_profile_link(fetcher, pib, cache=None, limiter=None, timeout=DEFAULT_WAIT_TIMEOUT, timings=NULL_TIMINGS,
+                     base_url=BASE_URL):
     """Pronađi profil link"""
     try:
-        driver.get(f"{BASE_URL}?n={pib}")
-        time.sleep(3)
+        search_url = f"{base_url}?n={pib}"
+        html = fetch_page(fetcher, search_url, cache, limiter, SEARCH_READY_XPATH, timeout, timings, 'search')
         
-        profile_links = driver.find_elements(By.CSS_SELECTOR, "a[href*='/firma/']")
-        if not profile_links:
-            return None
-        
-        return profile_links[0].get_attribute("href")
+        with timings.phase('search.parse'):
+            return extract_profile_link(html, search_url)
     except:
         return None
 
-def extract_data_from_profile(driver, profile_url):
+def extract_data_from_profile(fetcher, profile_url, cache=None, limiter=None, timeout=DEFAULT_WAIT_TIMEOUT,
+                              timings=NULL_TIMINGS):
     """Ekstraktuj podatke sa profil stranice"""
     try:
-        driver.get(profile_url)
-        time.sleep(2)
-        
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
-        page_text = soup.get_text()
-        
-        data = {'naziv': '', 'email': '', 'telefon': '', 'kd': '', 'prihod': '', 'broj_zaposlenih': '', 'grad': ''}
-        
-        # ===== IZVUCI PODATKE IZ FAQ SEKCIJE (div.qanda-body) =====
-        qanda_bodies = soup.find_all('div', class_='qanda-body')
-        
-        for qanda in qanda_bodies:
-            text = qanda.get_text()
-            
-            # Prihod
-            if 'prihod' in text.lower() and not data['prihod']:
-                # Traži broj u <span class="text-bold"> ili bilo gde u tekstu
-                bold_span = qanda.find('span', class_='text-bold')
-                if bold_span:
-                    prihod_match = re.search(r'([\d.,]+)', bold_span.get_text())
-                    if prihod_match:
-                        data['prihod'] = prihod_match.group(1).replace('.', '').replace(',', '.')
-                        print(f"    Prihod (FAQ): {data['prihod']}")
-            
-            # Broj zaposlenih
-            if 'zaposlenih' in text.lower() and not data['broj_zaposlenih']:
-                bold_span = qanda.find('span', class_='text-bold')
-                if bold_span:
-                    broj_match = re.search(r'(\d+)', bold_span.get_text())
-                    if broj_match and len(broj_match.group(1)) < 6:
-                        data['broj_zaposlenih'] = broj_match.group(1)
-                        print(f"    Broj zaposlenih (FAQ): {data['broj_zaposlenih']}")
-            
-            # Grad/Adresa
-            if 'adresa' in text.lower() and not data['grad']:
-                cities = ['BAR', 'PODGORICA', 'CETINJE', 'BUDVA', 'ULCINJ', 'HERCEG NOVI', 'KOTOR', 'TIVAT', 'NIKŠIĆ', 'PLJEVLJA']
-                for city in cities:
-                    if city in text.upper():
-                        data['grad'] = city
-                        print(f"    Grad (FAQ): {city}")
-                        break
-        
-        # ===== NAZIV =====
-        for tag in soup.find_all(['h1', 'h2', 'h3']):
-            text = tag.get_text().strip()
-            if text and len(text) > 3 and 'rezultati' not in text.lower():
-                data['naziv'] = text
-                break
-        
-        # ===== EMAIL =====
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        emails = re.findall(email_pattern, page_text)
-        if emails:
-            filtered = [e for e in emails if not any(skip in e.lower() for skip in ['companywall', 'example', 'test', 'noreply'])]
-            if filtered:
-                data['email'] = filtered[0]
-        
-        # ===== TELEFON =====
-        phone_patterns = [
-            r'\+382[\s\-]?\d{2}[\s\-]?\d{3}[\s\-]?\d{3}',
-            r'0\d{2}[\s\-]?\d{3}[\s\-]?\d{3}',
-            r'\d{3}[\s\-]?\d{3}[\s\-]?\d{3}',
-        ]
-        phones = []
-        for pattern in phone_patterns:
-            phones.extend(re.findall(pattern, page_text))
-        
-        if phones:
-            valid = []
-            for phone in phones:
-                clean = re.sub(r'[\s\-]', '', phone)
-                if re.match(r'^\+?\d{8,15}$', clean):
-                    valid.append(phone.strip())
-            if valid:
-                data['telefon'] = valid[0]
-        
-        # ===== KD =====
-        kd_patterns = [r'KD[:\s]*(\d{4})', r'(\d{4})']
-        for pattern in kd_patterns:
-            matches = re.findall(pattern, page_text, re.IGNORECASE)
-            if matches:
-                for match in matches:
-                    if len(str(match)) == 4:
-                        data['kd'] = str(match)
-                        break
-                if data['kd']:
-                    break
-        
-        return data
+        html = fetch_page(fetcher, profile_url, cache, limiter, PROFILE_READY_XPATH, timeout, timings, 'profile')
+        with timings.phase('parse'):
+            return parse_profile_html(html, timings=timings)
     except:
         return None
 
+# Zaglavlje po fajlu, da save_to_csv ne čita fajl pri svakom upisu; ključ je i
+# inode, pa atomski prepisan fajl (npr. nove kolone) ponovo čita zaglavlje
+_csv_headers = {}
+
+
 def save_to_csv(pib, data, output_file):
-    """Čuva rezultat u CSV"""
+    """Čuva jedan rezultat u CSV (za pojedinačne upise; main koristi sink)"""
     try:
-        import csv
-        file_exists = os.path.isfile(output_file)
-        
+        try:
+            st = os.stat(output_file)
+        except FileNotFoundError:
+            st = None
+        file_exists = st is not None and st.st_size > 0
+        if file_exists:
+            # Postojeći fajl zadržava svoj redosled kolona
+            key = (os.path.abspath(output_file), st.st_dev, st.st_ino)
+            columns = _csv_headers.get(key)
+            if columns is None:
+                with open(output_file, 'r', newline='', encoding='utf-8') as f:
+                    columns = _csv_headers[key] = next(csv.reader(f), None) or RESULT_COLUMNS
+        else:
+            columns = RESULT_COLUMNS
         with open(output_file, 'a', newline='', encoding='utf-8') as f:
             writer = csv.writer(f)
             if not file_exists:
-                writer.writerow(['pib', 'naziv', 'email', 'telefon', 'kd', 'prihod', 'broj_zaposlenih', 'grad'])
-            writer.writerow([pib, data.get('naziv', ''), data.get('email', ''), 
-                           data.get('telefon', ''), data.get('kd', ''), 
-                           data.get('prihod', ''), data.get('broj_zaposlenih', ''), 
-                           data.get('grad', '')])
+                writer.writerow(columns)
+            writer.writerow([pib if col == 'pib' else data.get(col, '') or '' for col in columns])
     except Exception as e:
         print(f"  ✗ Greška pri čuvanju: {e}")
 
+def run_reextract(args):
+    """Komanda reextract: parsiraj sačuvani HTML bez browsera i upiši nove rezultate"""
+    from reextract import find_cache_jobs, find_html_jobs, reextract_all
+    
+    if args.html_dir:
+        jobs = find_html_jobs(args.html_dir)
+    else:
+        pib_index = PibIndex(args.index_db)
+        jobs = find_cache_jobs(PageCache(args.cache_dir, args.cache_ttl_days, max_mb=None), pib_index)
+        pib_index.close()
+    
+    if not jobs:
+        print("✗ Nema sačuvanih profila za ponovnu ekstrakciju")
+        return
+    
+    # Uvek nov skup rezultata: pravi se pored ciljnog fajla i zamenjuje ga tek kada je ceo gotov
+    fd, tmp_path = tempfile.mkstemp(prefix='.' + os.path.basename(args.output) + '.', suffix='.tmp',
+                                    dir=os.path.dirname(os.path.abspath(args.output)))
+    os.close(fd)
+    replaced = False
+    try:
+        with open_sink(tmp_path, args.sink or sink_backend(args.output), batch_size=max(args.batch_size, 500),
+                       flush_interval=args.flush_interval, fsync=args.fsync) as sink:
+            reextract_all(jobs, sink, args.workers, args.kd_table)
+        if os.path.exists(args.output):
+            print(f"  Zamenjujem postojeći {args.output}")
+            shutil.copymode(args.output, tmp_path)
+        # WAL fajlovi stare SQLite baze ne smeju ostati uz novu
+        for path in (args.output + '-wal', args.output + '-shm'):
+            if os.path.exists(path):
+                os.remove(path)
+        os.replace(tmp_path, args.output)
+        replaced = True
+    except Exception as e:
+        print(f"✗ Greška pri ponovnoj ekstrakciji, {args.output} nije menjan: {e}")
+    finally:
+        if not replaced:
+            for path in (tmp_path, tmp_path + '-wal', tmp_path + '-shm'):
+                if os.path.exists(path):
+                    os.remove(path)
+
 def main():
     parser = argparse.ArgumentParser()
-    parser.add_argument('--input', default='input_pibs.txt')
-    parser.add_argument('--output', default='rezultati.csv')
+    parser.add_argument('command', nargs='?', default='scrape', choices=['scrape', 'reextract'],
+                        help='scrape (podrazumevano) ili reextract (ponovno parsiranje sačuvanog HTML-a)')
+    parser.add_argument('--input', default='input_pibs.txt', help='PIB-ovi: .txt (jedan po redu), .csv ili .xlsx/.xls (kolona pib; Excel zahteva openpyxl, odnosno xlrd za .xls)')
+    parser.add_argument('--no-check-digit', action='store_true', help='Ne odbacuj PIB-ove sa pogrešnom kontrolnom cifrom')
+    parser.add_argument('--output', help='Izlazni fajl (podrazumevano rezultati.csv, za reextract rezultati_reextract.csv)')
     parser.add_argument('--pibs-per-server', type=int, default=12)
+    parser.add_argument('--no-vpn', action='store_true', help='Bez NordVPN konekcije i rotacije (npr. lokalni stub server)')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help='Folder za keš HTML stranica')
+    parser.add_argument('--cache-ttl-days', type=float, default=DEFAULT_TTL_DAYS, help='Koliko dana važi stranica u kešu')
+    parser.add_argument('--cache-max-mb', type=float, default=DEFAULT_MAX_MB, help='Maksimalna veličina keša u MB')
+    parser.add_argument('--no-cache', action='store_true', help='Uvek učitaj stranice sa sajta')
+    parser.add_argument('--rate', type=float, default=DEFAULT_REQUESTS_PER_MINUTE, help='Najviše zahteva prema sajtu u minuti')
+    parser.add_argument('--burst', type=int, default=DEFAULT_BURST, help='Koliko zahteva sme da ide odjednom')
+    parser.add_argument('--fetcher', choices=FETCHER_BACKENDS, default='selenium',
+                        help='selenium (Chrome), http (bez browsera), auto (HTTP, a Selenium kada HTTP nije dovoljan) '
+                             'ili replay (snimljene stranice iz --replay-dir)')
+    parser.add_argument('--replay-dir', default=DEFAULT_REPLAY_DIR, help='replay: folder sa snimljenim stranicama (urls.json)')
+    parser.add_argument('--base-url', default=BASE_URL, help='URL pretrage (npr. lokalni stub server za testove)')
+    parser.add_argument('--lean', action='store_true', help='Browser bez slika, fontova, medija i third-party skripti (eager učitavanje)')
+    parser.add_argument('--warm', action='store_true', help='selenium: pokreni Chrome u pozadini dok se učitavaju PIB-ovi')
+    parser.add_argument('--driver-cache', default=DEFAULT_DRIVER_CACHE, help='JSON sa zapamćenom putanjom do chromedriver-a')
+    parser.add_argument('--chromedriver-version', help='Tačna verzija chromedriver-a (podrazumevano prema instaliranom Chrome-u)')
+    parser.add_argument('--wait-timeout', type=float, default=DEFAULT_WAIT_TIMEOUT, help='Najduže čekanje na elemente stranice (s)')
+    parser.add_argument('--index-db', default=DEFAULT_INDEX_DB, help='SQLite indeks PIB → URL profila')
+    parser.add_argument('--no-index', action='store_true', help='Uvek traži profil preko pretrage')
+    parser.add_argument('--sink', choices=sorted(SINK_BACKENDS), help='Format izlaza (podrazumevano po ekstenziji)')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Broj redova po upisu u izlaz')
+    parser.add_argument('--flush-interval', type=float, default=DEFAULT_FLUSH_INTERVAL, help='Najviše sekundi između upisa')
+    parser.add_argument('--fsync', action='store_true', help='fsync posle svake serije (sporije, najsigurnije)')
+    parser.add_argument('--pipeline', action='store_true', help='Parsiranje i upis u posebnim nitima dok browser učitava sledeći profil')
+    parser.add_argument('--parse-workers', type=int, default=DEFAULT_PARSE_WORKERS, help='pipeline: broj niti za parsiranje')
+    parser.add_argument('--queue-size', type=int, default=DEFAULT_QUEUE_SIZE, help='pipeline: najviše stranica koje čekaju na parsiranje/upis')
+    parser.add_argument('--metrics-file', default=DEFAULT_METRICS_FILE, help='JSON-lines sa trajanjem faza po PIB-u (prazno = isključeno)')
+    parser.add_argument('--profile', action='store_true', help=f'cProfile ({DEFAULT_PROFILE_FILE}) i tracemalloc top alokacije na kraju')
+    parser.add_argument('--html-dir', help='reextract: folder sa sačuvanim profilima (<pib>.html) umesto keša')
+    parser.add_argument('--workers', type=int, help='reextract: broj procesa (podrazumevano broj jezgara)')
+    parser.add_argument('--refresh-older-than', type=float, metavar='DANA',
+                        help='Osvežavanje: samo PIB-ovi preuzeti pre više od N dana, nepromenjeni profili se ne upisuju')
+    parser.add_argument('--resume', action='store_true', help='Preskoči PIB-ove koji su već u izlaznom fajlu i ponovi neuspešne iz ulaza')
+    parser.add_argument('--kd-table', help='CSV šifarnik djelatnosti (kolone sifra, naziv) umesto ugrađenog KD 2010')
     args = parser.parse_args()
     
-    # Učitaj PIBove
+    if args.kd_table:
+        try:
+            print(f"Šifarnik djelatnosti: {args.kd_table} ({len(set_kd_table(args.kd_table))} šifara)")
+        except Exception as e:
+            print(f"✗ Greška pri učitavanju šifarnika {args.kd_table}: {e}")
+            return
+    if not args.output:
+        args.output = 'rezultati_reextract.csv' if args.command == 'reextract' else 'rezultati.csv'
+    if args.command == 'reextract':
+        run_reextract(args)
+        return
+    
+    # Kreiraj fetcher (Chrome se pokreće samo ako ga izabrani backend koristi, sa --warm odmah u pozadini)
+    fetcher = create_fetcher(args.fetcher, lambda: create_chrome_driver(headless=True, lean=args.lean,
+                                                                        driver_cache=args.driver_cache,
+                                                                        driver_version=args.chromedriver_version),
+                             replay_dir=args.replay_dir)
+    if args.warm:
+        fetcher.warm()
+    
+    cache = None if args.no_cache else PageCache(args.cache_dir, args.cache_ttl_days, args.cache_max_mb)
+    pib_index = None if args.no_index else PibIndex(args.index_db)
+    limiter = RateLimiter(args.rate, args.burst)
+    metrics = RunMetrics(args.metrics_file or None)
+    
+    try:
+        sink = open_sink(args.output, args.sink, batch_size=args.batch_size,
+                         flush_interval=args.flush_interval, fsync=args.fsync)
+    except Exception as e:
+        print(f"✗ Greška pri otvaranju izlaza: {e}")
+        fetcher.close()
+        return
+    
+    journal_file = failed_journal_path(args.output)
+    failed = load_failed_pibs(journal_file)
+    completed = load_completed_pibs(sink) if args.resume else set()
+    
+    # Učitaj i proveri PIBove pre nego što se pokrene VPN i browser
     try:
-        with open(args.input, 'r', encoding='utf-8') as f:
-            pibs = [line.strip() for line in f if line.strip()]
+        pibs, report = load_pibs(args.input, exclude=completed, check_digit=not args.no_check_digit)
     except Exception as e:
         print(f"✗ Greška pri učitavanju PIBova: {e}")
+        sink.close()
+        fetcher.close()
         return
     
-    print(f"Učitano {len(pibs)} PIBova")
-    print(f"VPN rotacija svakih {args.pibs_per_server} PIBova\n")
+    report.print()
+    if args.resume:
+        pibs, retried = plan_resume(pibs, completed, failed)
+        print(f"Nastavak: {len(completed)} već završeno, {retried} ranije neuspešnih, preostalo {len(pibs)}")
+    refresh = args.refresh_older_than is not None
+    if refresh:
+        if pib_index is None:
+            print("✗ Osvežavanje zahteva PIB indeks (bez --no-index)")
+            sink.close()
+            fetcher.close()
+            return
+        fresh = pib_index.fresh_pibs(args.refresh_older_than)
+        before = len(pibs)
+        pibs = [pib for pib in pibs if pib not in fresh]
+        print(f"Osvežavanje: {before - len(pibs)} PIBova preuzeto pre manje od {args.refresh_older_than:g} dana, "
+              f"preostalo {len(pibs)}")
+    if not pibs:
+        print("Nema PIBova za obradu")
+        sink.close()
+        fetcher.close()
+        return
+    current_server_index, used_servers = 0, []
+    if args.no_vpn:
+        print("VPN isključen (--no-vpn)\n")
+    else:
+        print(f"VPN rotacija svakih {args.pibs_per_server} PIBova\n")
     
-    # Učitaj VPN stanje
-    current_server_index, used_servers = load_vpn_state()
+        # Učitaj VPN stanje
+        current_server_index, used_servers = load_vpn_state()
     
-    # Konektuj na početni VPN
-    if current_server_index >= len(VPN_SERVERS):
-        current_server_index = 0
+        # Konektuj na početni VPN
+        if current_server_index >= len(VPN_SERVERS):
+            current_server_index = 0
     
-    current_server = VPN_SERVERS[current_server_index]
-    print(f"Konektujem na početni VPN server: {current_server}")
+        current_server = VPN_SERVERS[current_server_index]
+        print(f"Konektujem na početni VPN server: {current_server}")
     
-    if not connect_to_vpn_server(current_server):
-        print("✗ Nisam mogao da se konektujem ni na jedan VPN server!")
-        return
+        if not connect_to_vpn_server(current_server):
+            print("✗ Nisam mogao da se konektujem ni na jedan VPN server!")
+            sink.close()
+            fetcher.close()
+            return
     
-    used_servers.append(current_server)
-    save_vpn_state(current_server_index, used_servers)
+        used_servers.append(current_server)
+        save_vpn_state(current_server_index, used_servers)
     
-    # Kreiraj driver
-    driver = create_chrome_driver(headless=True)
-    if not driver:
-        return
     
+    # Selenium: sačekaj Chrome (pokrenut unapred sa --warm) pre prvog PIB-a
+    if args.fetcher == 'selenium':
+        try:
+            fetcher.driver
+        except RuntimeError:
+            sink.close()
+            fetcher.close()
+            return
+    
+    # Parsiranje i upis: odmah, ili u posebnim nitima dok browser učitava sledeći profil
+    stage_args = (sink, metrics,
+                  lambda pib: record_success(journal_file, failed, pib),
+                  lambda pib, reason: record_failure(journal_file, failed, pib, reason))
+    if args.pipeline:
+        stages = PipelinedStages(*stage_args, parse_workers=args.parse_workers, queue_size=args.queue_size)
+        print(f"Pipeline: {args.parse_workers} niti za parsiranje, red od {args.queue_size} stranica")
+    else:
+        stages = InlineStages(*stage_args)
+    
+    profiler = start_profiling() if args.profile else None
     try:
-        success_count = 0
+        stages.start()
         
         for i, pib in enumerate(pibs, 1):
+            job = PageJob(pib, metrics.start(pib))
+            timings = job.timings
             print(f"\n[{i}/{len(pibs)}] PIB: {pib}")
-            print(f"  VPN: {VPN_SERVERS[current_server_index]}")
+            if not args.no_vpn:
+                print(f"  VPN: {VPN_SERVERS[current_server_index]}")
             
             # Rotacija VPN-a svakih N PIBova
-            if i > 1 and (i - 1) % args.pibs_per_server == 0:
+            if not args.no_vpn and i > 1 and (i - 1) % args.pibs_per_server == 0:
                 print(f"\n{'='*50}")
                 print(f"  VPN ROTACIJA nakon {args.pibs_per_server} PIBova")
                 print(f"{'='*50}")
@@ -420,41 +647,71 @@ def main():
                     save_vpn_state(current_server_index, used_servers)
                     time.sleep(3)
             
-            # Pronađi profil
-            profile_url = get_profile_link(driver, pib)
-            if not profile_url:
-                print(f"  ✗ Nisam pronašao profil")
-                continue
-            
-            print(f"  ✓ Link: {profile_url}")
+            # Linkovi iz indeksa koji nisu dali podatke (indeks je vezan za ovu nit)
+            stages.apply_index_updates(pib_index)
             
-            # Ekstraktuj podatke
-            data = extract_data_from_profile(driver, profile_url)
-            if not data:
-                print(f"  ✗ Greška pri ekstraktovanju")
-                continue
+            # Pronađi profil (poznati PIB-ovi idu direktno na profil, bez pretrage)
+            with timings.phase('index'):
+                profile_url = pib_index.get(pib) if pib_index is not None else None
+            from_index = profile_url is not None
+            if not profile_url:
+                profile_url = get_profile_link(fetcher, pib, cache, limiter, args.wait_timeout, timings, args.base_url)
+                if not profile_url:
+                    print(f"  ✗ Nisam pronašao profil")
+                    stages.fail(job, "not_found", "profil nije pronađen")
+                    continue
+                if pib_index is not None:
+                    pib_index.put(pib, profile_url)
             
-            # Prikaži podatke
-            if data.get('naziv'):
-                print(f"  → Naziv: {data['naziv']}")
-            if data.get('email'):
-                print(f"  → Email: {data['email']}")
-            if data.get('telefon'):
-                print(f"  → Telefon: {data['telefon']}")
-            if data.get('kd'):
-                print(f"  → KD: {data['kd']}")
+            print(f"  ✓ Link{' (indeks)' if from_index else ''}: {profile_url}")
+            job.profile_url, job.from_index = profile_url, from_index
             
-            # Sačuvaj
-            save_to_csv(pib, data, args.output)
-            success_count += 1
-            print(f"  ✓ Sačuvano ({success_count}/{i})")
+            # Učitaj profil (pri osvežavanju uvek sa sajta); parsiranje i upis preuzimaju faze
+            try:
+                job.html, job.fetched_at = fetch_page_dated(fetcher, profile_url, cache, limiter, PROFILE_READY_XPATH,
+                                                            args.wait_timeout, timings, 'profile', read_cache=not refresh)
+            except Exception as e:
+                print(f"  ✗ Greška pri učitavanju profila: {e}")
             
-            time.sleep(2)
+            # Isti sadržaj kao pri poslednjem preuzimanju: nema parsiranja ni upisa
+            if job.html is not None and pib_index is not None:
+                with timings.phase('hash'):
+                    job.content_hash = content_hash(job.html)
+                if refresh and from_index and job.content_hash == pib_index.content_hash(pib):
+                    pib_index.mark_fetched(pib, job.content_hash, job.fetched_at)
+                    job.html = None
+                    stages.skip(job)
+                    continue
+            stages.submit(job)
     
     finally:
-        driver.quit()
-        disconnect_vpn()
-        print(f"\n✓ Gotovo! Obrađeno {success_count}/{len(pibs)} PIBova")
+        stages.close()
+        if profiler is not None:
+            stop_profiling(profiler)
+        sink.close()
+        merged = None
+        if refresh and isinstance(sink, CsvSink) and stages.success_count:
+            # CSV nema upsert: osveženi profili su dopisani na kraj i zamenjuju stari red ceo,
+            # kao INSERT OR REPLACE u SQLite izlazu (kontakt koji je nestao sa profila se briše)
+            merger = ResultMerger(args.output, default_rule=REPLACE)
+            merger.close()
+            merged = merger.duplicates
+        fetcher.close()
+        if not args.no_vpn:
+            disconnect_vpn()
+        print(f"\n✓ Gotovo! Obrađeno {stages.success_count}/{len(pibs)} PIBova")
+        if refresh:
+            print(f"  Bez promena (preskočeno parsiranje i upis): {stages.unchanged_count}")
+        if merged is not None:
+            print(f"  Osveženi redovi spojeni sa postojećim u {args.output}: {merged.updated + merged.unchanged}")
+        if cache is not None:
+            print(f"  Keš: {cache.hits} pogodaka, {cache.misses} promašaja")
+        print(f"  Čekanje zbog limita zahteva: {limiter.waited:.0f}s")
+        metrics.print_summary()
+        metrics.close()
+        if pib_index is not None:
+            stages.apply_index_updates(pib_index)
+            pib_index.close()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Zajednička normalizacija teksta za scraper i formatter
+
+Sve ide kroz unapred izračunate str.translate tabele, pa je zamena
+dijakritika (uključujući 'đ' → 'dj') i promena veličine slova jedan prolaz
+kroz string umesto niza str.replace / lower() / upper() poziva.
+"""
+
+import re
+import string
+from functools import lru_cache
+
+# Mapa za zamenu dijakritičkih znakova
+DIACRITIC_MAP = {
+    'š': 's', 'Š': 'S',
+    'č': 'c', 'Č': 'C',
+    'ć': 'c', 'Ć': 'C',
+    'đ': 'dj', 'Đ': 'Dj',
+    'ž': 'z', 'Ž': 'Z'
+}
+DIACRITIC_CHARS = ''.join(DIACRITIC_MAP)
+DIACRITIC_PATTERN = f'[{DIACRITIC_CHARS}]'
+
+# Samo dijakritici (veličina slova ostaje)
+DIACRITIC_TABLE = str.maketrans(DIACRITIC_MAP)
+
+# Ključevi za poređenje: dijakritici + velika slova u istom prolazu
+_UPPER_MAP = dict(zip(string.ascii_lowercase, string.ascii_uppercase))
+_UPPER_MAP.update({char: ascii_.upper() for char, ascii_ in DIACRITIC_MAP.items()})
+UPPER_KEY_TABLE = str.maketrans(_UPPER_MAP)
+
+_SEPARATORS_RE = re.compile(r'[\s\-]+')
+
+
+@lru_cache(maxsize=8192)
+def strip_diacritics(text):
+    """Tekst bez dijakritika ('Đurđa Šić' → 'Djurdja Sic')"""
+    return text.translate(DIACRITIC_TABLE)
+
+
+@lru_cache(maxsize=8192)
+def upper_key(text):
+    """Ključ za poređenje: velika slova bez dijakritika, razmaci i crtice kao jedan razmak"""
+    return _SEPARATORS_RE.sub(' ', text.translate(UPPER_KEY_TABLE))
+
+
+def strip_diacritics_series(series):
+    """Vektorizovana zamena dijakritika za pandas Series (NaN ostaje NaN)"""
+    return series.str.translate(DIACRITIC_TABLE)
+
+
+def has_diacritics_series(series):
+    """Maska redova koji sadrže dijakritike"""
+    return series.str.contains(DIACRITIC_PATTERN, regex=True, na=False)